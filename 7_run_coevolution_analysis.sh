@@ -61,12 +61,16 @@ Required Arguments:
 
 Optional Arguments:
   --max-gap-percent N  Maximum gap percentage to include position (default: 50)
+  --min-entropy N      Drop columns with entropy <= N bits (default: 0)
   --include-gaps       Include gaps as valid state in calculations (default: no)
   --top-pairs N        Number of top covarying pairs to visualize (default: 50)
   --analyze-position P Analyze specific residue (e.g., GLU233, can use multiple times)
   --msa-file FILE      Use custom MSA file instead of default msa_fasta.aln
   --find-triplets      Search for 3-way coevolution (SLOW but finds higher-order signals)
   --triplet-candidates N  Max positions to test for triplets (default: 100)
+  --triplet-partner-k N   Prune triplets whose pairs fall outside each position's
+                          top N MI partners (default: no pruning; faster but can
+                          miss synergistic triplets with weak pairwise signal)
   -h, --help          Show this help message
 
 Examples:
@@ -135,6 +139,10 @@ while [[ $# -gt 0 ]]; do
             EXTRA_ARGS="$EXTRA_ARGS --max-gap-percent $2"
             shift 2
             ;;
+        --min-entropy)
+            EXTRA_ARGS="$EXTRA_ARGS --min-entropy $2"
+            shift 2
+            ;;
         --include-gaps)
             EXTRA_ARGS="$EXTRA_ARGS --include-gaps"
             shift
@@ -143,6 +151,10 @@ while [[ $# -gt 0 ]]; do
             EXTRA_ARGS="$EXTRA_ARGS --top-pairs $2"
             shift 2
             ;;
+        --triplet-partner-k)
+            EXTRA_ARGS="$EXTRA_ARGS --triplet-partner-k $2"
+            shift 2
+            ;;
         --analyze-position)
             ANALYZE_POSITIONS+=("$2")
             shift 2
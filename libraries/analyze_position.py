@@ -6,30 +6,165 @@ Analyze amino acid distribution at specific positions in ConSurf MSA
 import sys
 import argparse
 from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from pathlib import Path
+import multiprocessing
 import os
+import mmap
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+except ImportError:  # numba is optional; the numpy path is used instead
+    njit = None
+
+
+if njit is not None:
+    @njit(parallel=True, cache=True)
+    def _count_columns_jit(msa_bytes, counts):
+        """Fill the per-column byte histogram, parallel over columns."""
+        n_seq, aln_len = msa_bytes.shape
+        for j in prange(aln_len):
+            for i in range(n_seq):
+                counts[j, msa_bytes[i, j]] += 1
+
+
+# Chemical property groups; GROUP_LUT maps a residue byte to its group
+# id (1..5, 0 = ungrouped) so the per-group percentages come out of one
+# weighted bincount instead of five Python loops
+AA_GROUPS = (
+    ('Hydrophobic (A,V,I,L,M,F,Y,W)', 'AVILMFYW'),
+    ('Polar uncharged (S,T,N,Q,C)', 'STNQC'),
+    ('Positively charged (K,R,H)', 'KRH'),
+    ('Negatively charged (D,E)', 'DE'),
+    ('Special (G,P)', 'GP'),
+)
+GROUP_LUT = np.zeros(256, dtype=np.int8)
+for _group_id, (_, _members) in enumerate(AA_GROUPS, 1):
+    for _aa in _members:
+        GROUP_LUT[ord(_aa)] = _group_id
+
+# Precomputed bar-chart strings; a percentage maps to at most 50 blocks
+BARS = tuple('█' * i for i in range(51))
+
+
+def build_msa_matrix(sequences):
+    """Pack aligned sequences into a 2D uint8 array (n_seq x aln_len).
+
+    All sequences must have the same length (it is an alignment).
+    Column slices of this array give all residues at one alignment
+    position without per-sequence Python iteration.
+    """
+    n_seq = len(sequences)
+    aln_len = len(sequences[0])
+    for seq in sequences:
+        if len(seq) != aln_len:
+            raise ValueError("MSA sequences have unequal lengths")
+    flat = ''.join(sequences).encode('ascii')
+    return np.frombuffer(flat, dtype=np.uint8).reshape(n_seq, aln_len)
+
+
+def column_conservation(counts_matrix):
+    """Dominant residue and its percentage for every column, vectorized.
+
+    Returns (top_codes, top_counts, top_pct) arrays over alignment
+    columns; gap characters are excluded. Ties resolve to the
+    alphabetically first residue, matching the sorted distributions.
+    """
+    counts = counts_matrix.copy()
+    counts[:, ord('-')] = 0
+    top_codes = counts.argmax(axis=1)
+    top_counts = counts.max(axis=1)
+    nongap = counts.sum(axis=1)
+    top_pct = np.where(nongap > 0, top_counts / np.maximum(nongap, 1) * 100, 0.0)
+    return top_codes, top_counts, top_pct
+
+
+def build_sequence_dedup(msa_bytes):
+    """Group identical alignment rows once for reuse at every position.
+
+    Returns (unique_idx, inverse): the index of one representative row
+    per distinct sequence, and for each original row the id of its
+    representative. ConSurf MSAs often contain many identical rows, so
+    per-position grouping only needs to classify the representatives.
+    """
+    aln_len = msa_bytes.shape[1]
+    row_view = np.ascontiguousarray(msa_bytes).view(f'S{aln_len}').ravel()
+    _, unique_idx, inverse = np.unique(row_view, return_index=True, return_inverse=True)
+    return unique_idx, inverse
+
+
+def encode_msa_alphabet(msa_bytes):
+    """Recode the alignment to a dense integer alphabet.
+
+    Returns (codes, code_to_byte): the matrix rewritten to values
+    0..n-1 over the residue bytes actually present, and the array
+    mapping each code back to its byte. Distinct letters stay distinct,
+    so nonstandard residues (X, B, Z, ...) are preserved.
+    """
+    code_to_byte = np.unique(msa_bytes)
+    char_to_code = np.zeros(256, dtype=np.uint8)
+    char_to_code[code_to_byte] = np.arange(len(code_to_byte), dtype=np.uint8)
+    return char_to_code[msa_bytes], code_to_byte
+
+
+def count_all_positions(msa_bytes):
+    """Build the per-position byte histogram for the whole alignment.
+
+    Returns an (aln_len, 256) int array where row j is the count of each
+    residue byte in column j. Counting runs over the dense integer
+    alphabet (~22 codes) so the working histogram stays cache-resident;
+    a numba kernel parallelized over columns is used when numba is
+    installed, otherwise one vectorized numpy pass per code.
+    """
+    aln_len = msa_bytes.shape[1]
+    codes, code_to_byte = encode_msa_alphabet(msa_bytes)
+    compact = np.zeros((aln_len, len(code_to_byte)), dtype=np.int64)
+    if njit is not None:
+        _count_columns_jit(np.ascontiguousarray(codes), compact)
+    else:
+        for code in range(len(code_to_byte)):
+            compact[:, code] = (codes == code).sum(axis=0)
+
+    counts = np.zeros((aln_len, 256), dtype=np.int64)
+    counts[:, code_to_byte] = compact
+    return counts
 
 
 def parse_msa_fasta_with_headers(msa_file):
-    """Parse FASTA format MSA file, returning both headers and sequences"""
-    sequences = []
+    """Parse FASTA format MSA file, returning both headers and sequences.
+
+    Memory-maps the file and walks record boundaries with bytes.find, so
+    the OS pages data in on demand instead of allocating a full in-heap
+    copy, and parsing runs in C-level bytes operations instead of a
+    per-line Python loop.
+    """
     headers = []
-    with open(msa_file, 'r') as f:
-        current_seq = []
-        current_header = None
-        for line in f:
-            line = line.strip()
-            if line.startswith('>'):
-                if current_seq and current_header:
-                    sequences.append(''.join(current_seq))
-                    headers.append(current_header)
-                    current_seq = []
-                current_header = line
-            else:
-                current_seq.append(line)
-        if current_seq and current_header:
-            sequences.append(''.join(current_seq))
-            headers.append(current_header)
+    sequences = []
+    with open(msa_file, 'rb') as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file cannot be mapped
+            return headers, sequences
+        with mm:
+            size = len(mm)
+            start = mm.find(b'>')
+            while 0 <= start < size:
+                end = mm.find(b'\n>', start)
+                if end == -1:
+                    end = size
+                record = mm[start + 1:end]
+                start = end + 1
+                newline = record.find(b'\n')
+                if newline == -1:
+                    continue
+                header = record[:newline].strip()
+                seq = record[newline + 1:].replace(b'\r', b'').replace(b'\n', b'').replace(b' ', b'')
+                if header and seq:
+                    headers.append('>' + header.decode())
+                    sequences.append(seq.decode('ascii'))
     return headers, sequences
 
 
@@ -39,24 +174,84 @@ def parse_msa_fasta(msa_file):
     return sequences
 
 
-def find_alignment_position(query_seq, target_position):
+@lru_cache(maxsize=None)
+def parse_grades_positions(grades_file):
+    """Parse the grades file once into {position: pdb_position}.
+
+    Positions appear in file order; a single scan replaces per-position
+    re-reads of the file. Cached so repeated lookups against the same
+    grades file within one run parse it only once.
+    """
+    pdb_by_pos = {}
+    with open(grades_file, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith('*') and not line.startswith('POS'):
+                parts = line.split()
+                if len(parts) >= 3 and parts[0].isdigit():
+                    pdb_by_pos[int(parts[0])] = parts[2]
+    return pdb_by_pos
+
+
+def build_query_position_map(query_seq):
+    """Map 1-indexed query positions to alignment indices in one pass.
+
+    Entry p-1 of the returned array is the alignment index of query
+    position p.
+    """
+    query_bytes = np.frombuffer(query_seq.encode('ascii'), dtype=np.uint8)
+    return np.flatnonzero(query_bytes != ord('-'))
+
+
+def find_alignment_position(query_seq, target_position, position_map=None):
     """
     Find alignment position corresponding to query sequence position.
     target_position is 1-indexed (as in PDB/grades file)
     """
-    query_position = 0
-    for i, aa in enumerate(query_seq):
-        if aa != '-':
-            query_position += 1
-            if query_position == target_position:
-                return i
+    if position_map is None:
+        position_map = build_query_position_map(query_seq)
+    if 1 <= target_position <= len(position_map):
+        return int(position_map[target_position - 1])
     return None
 
 
-def create_fasta_files_by_amino_acid(msa_file, position, alignment_pos, pdb_position, results_dir):
+# Upper bound on buffers per writev call (IOV_MAX on Linux)
+_IOV_MAX = 1024
+
+
+def build_record_blobs(headers, sequences):
+    """Pre-encode every FASTA record once for reuse at every position."""
+    return [f"{header}\n{seq}\n".encode() for header, seq in zip(headers, sequences)]
+
+
+def _write_fasta_group(path, blobs):
+    """Write pre-encoded records with scatter-gather writev syscalls.
+
+    Avoids concatenating the group into one monolithic string; the
+    kernel gathers the per-record buffers directly.
+    """
+    fd = os.open(str(path), os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        for i in range(0, len(blobs), _IOV_MAX):
+            chunk = blobs[i:i + _IOV_MAX]
+            while chunk:
+                written = os.writev(fd, chunk)
+                while chunk and written >= len(chunk[0]):
+                    written -= len(chunk[0])
+                    chunk.pop(0)
+                if written:  # partial write of the first remaining buffer
+                    chunk[0] = chunk[0][written:]
+    finally:
+        os.close(fd)
+
+
+def create_fasta_files_by_amino_acid(headers, sequences, position, alignment_pos, pdb_position, results_dir, msa_bytes=None, seq_dedup=None, record_blobs=None):
     """
     Create folder structure with FASTA files organized by amino acid at position.
-    
+
+    Takes the already-parsed MSA (headers, sequences) so callers that
+    loop over many positions parse the file only once.
+
     Structure:
     results_dir/amino_acids_analysis_results/position_X_PDB_Y/
         ├── not_covered/
@@ -68,9 +263,6 @@ def create_fasta_files_by_amino_acid(msa_file, position, alignment_pos, pdb_posi
             │   └── sequences.fasta
             ...
     """
-    # Read MSA with headers
-    headers, sequences = parse_msa_fasta_with_headers(msa_file)
-    
     # Create base directory structure
     base_dir = Path(results_dir) / "amino_acids_analysis_results"
     base_dir.mkdir(exist_ok=True)
@@ -87,49 +279,72 @@ def create_fasta_files_by_amino_acid(msa_file, position, alignment_pos, pdb_posi
     covered_dir = position_dir / "covered"
     covered_dir.mkdir(exist_ok=True)
     
-    # Organize sequences by amino acid
-    aa_sequences = {}  # {aa: [(header, sequence), ...]}
-    gap_sequences = []  # [(header, sequence), ...]
-    
-    for header, seq in zip(headers, sequences):
-        aa = seq[alignment_pos]
+    # Organize sequences by amino acid: one stable argsort on the numpy
+    # column groups all sequences in a single C-level scan. When a dedup
+    # mapping is supplied, only the distinct sequences are classified
+    # and group membership is expanded afterwards.
+    if msa_bytes is None:
+        msa_bytes = build_msa_matrix(sequences)
+    col = msa_bytes[:, alignment_pos]
+
+    if seq_dedup is not None:
+        unique_idx, inverse = seq_dedup
+        group_col = col[unique_idx]
+    else:
+        group_col = col
+    order = np.argsort(group_col, kind='stable')
+    sorted_col = group_col[order]
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(sorted_col)) + 1, [len(group_col)]))
+
+    aa_groups = {}  # {aa: member row indices}
+    gap_idx = None  # member row indices with a gap at this position
+
+    for start, end in zip(starts[:-1], starts[1:]):
+        aa = chr(sorted_col[start])
+        if seq_dedup is not None:
+            # Expand representative ids back to all member rows, keeping
+            # the original sequence order
+            member_idx = np.flatnonzero(np.isin(inverse, order[start:end]))
+        else:
+            member_idx = order[start:end]
         if aa == '-':
-            gap_sequences.append((header, seq))
+            gap_idx = member_idx
         else:
-            if aa not in aa_sequences:
-                aa_sequences[aa] = []
-            aa_sequences[aa].append((header, seq))
-    
+            aa_groups[aa] = member_idx
+
+    def write_group(path, member_idx):
+        if record_blobs is not None:
+            _write_fasta_group(path, [record_blobs[i] for i in member_idx])
+        else:
+            with open(path, 'w') as f:
+                f.write(''.join(f"{headers[i]}\n{sequences[i]}\n" for i in member_idx))
+
     # Write not_covered sequences
-    if gap_sequences:
+    if gap_idx is not None and len(gap_idx):
         not_covered_file = not_covered_dir / "sequences.fasta"
-        with open(not_covered_file, 'w') as f:
-            for header, seq in gap_sequences:
-                f.write(f"{header}\n{seq}\n")
-        print(f"  ✓ Not covered: {len(gap_sequences)} sequences → {not_covered_file}")
-    
+        write_group(not_covered_file, gap_idx)
+        print(f"  ✓ Not covered: {len(gap_idx)} sequences → {not_covered_file}")
+
     # Count total non-gap for percentages
-    total_non_gap = sum(len(seqs) for seqs in aa_sequences.values())
-    
+    total_non_gap = sum(len(idx) for idx in aa_groups.values())
+
     # Sort amino acids by count (descending)
-    sorted_aa = sorted(aa_sequences.items(), key=lambda x: len(x[1]), reverse=True)
-    
+    sorted_aa = sorted(aa_groups.items(), key=lambda x: len(x[1]), reverse=True)
+
     # Write covered sequences, one folder per amino acid
-    for rank, (aa, seqs) in enumerate(sorted_aa, 1):
-        count = len(seqs)
+    for rank, (aa, member_idx) in enumerate(sorted_aa, 1):
+        count = len(member_idx)
         percentage = (count / total_non_gap) * 100 if total_non_gap > 0 else 0
-        
+
         # Create folder name: rank_AA_percentage
         folder_name = f"{rank}_{aa}_{percentage:.1f}"
         aa_dir = covered_dir / folder_name
         aa_dir.mkdir(exist_ok=True)
-        
+
         # Write sequences to FASTA file
         aa_file = aa_dir / "sequences.fasta"
-        with open(aa_file, 'w') as f:
-            for header, seq in seqs:
-                f.write(f"{header}\n{seq}\n")
-        
+        write_group(aa_file, member_idx)
+
         print(f"  ✓ {rank}. {aa} ({percentage:.1f}%): {count} sequences → {aa_file}")
     
     print(f"\n✓ Folder structure created: {position_dir}")
@@ -138,43 +353,46 @@ def create_fasta_files_by_amino_acid(msa_file, position, alignment_pos, pdb_posi
 
 def analyze_position(msa_file, grades_file, position, output_file=None, create_folders=True):
     """Analyze amino acid distribution at a specific position"""
-    
-    # Read MSA
-    sequences = parse_msa_fasta(msa_file)
+
+    # Read MSA once, then delegate to the parsed-data core
+    headers, sequences = parse_msa_fasta_with_headers(msa_file)
+    msa_bytes = build_msa_matrix(sequences)
+    results_dir = Path(msa_file).parent
+    return analyze_position_parsed(headers, sequences, msa_bytes, grades_file,
+                                   position, results_dir, output_file, create_folders)
+
+
+def analyze_position_parsed(headers, sequences, msa_bytes, grades_file, position,
+                            results_dir, output_file=None, create_folders=True):
+    """Core of analyze_position operating on an already-parsed MSA.
+
+    Callers that analyze several positions parse the MSA once and call
+    this directly instead of re-reading the file per position.
+    """
     query_seq = sequences[0]
-    
+
     # Find alignment position
     alignment_pos = find_alignment_position(query_seq, position)
-    
+
     if alignment_pos is None:
         print(f"ERROR: Position {position} not found in query sequence")
         return None
-    
+
     # Get query amino acid
     query_aa = query_seq[alignment_pos]
-    
-    # Count amino acids at this position
-    aa_at_position = []
-    for seq in sequences:
-        aa = seq[alignment_pos]
-        if aa != '-':
-            aa_at_position.append(aa)
-    
-    aa_counts = Counter(aa_at_position)
-    total_non_gap = len(aa_at_position)
-    
-    # Read grades file to get PDB position
-    pdb_position = None
-    grades_line = None
-    with open(grades_file, 'r') as f:
-        for line in f:
-            if line.strip().startswith(str(position) + '\t'):
-                grades_line = line.strip()
-                parts = line.split()
-                if len(parts) >= 3:
-                    pdb_position = parts[2]
-                break
-    
+
+    # Count amino acids at this position: np.unique on the packed column
+    # instead of building a per-residue Python list
+    col = msa_bytes[:, alignment_pos]
+    nongap = col[col != ord('-')]
+    uniq, counts = np.unique(nongap, return_counts=True)
+    aa_counts = Counter({chr(code): int(count) for code, count in zip(uniq, counts)})
+    total_non_gap = int(nongap.size)
+    
+    # PDB position from the cached grades table
+    pdb_position = parse_grades_positions(grades_file).get(position)
+
+
     # Prepare output
     result = []
     result.append("=" * 80)
@@ -198,30 +416,23 @@ def analyze_position(msa_file, grades_file, position, output_file=None, create_f
     for aa, count in sorted_aa:
         percentage = (count / total_non_gap) * 100
         cumulative += percentage
-        bar = '█' * int(percentage / 2)
+        bar = BARS[min(50, int(percentage / 2))]
         marker = ' ← Query' if aa == query_aa else ''
         result.append(f"{aa:<5} {count:<10} {percentage:>6.2f}%   {cumulative:>6.2f}%        {bar}{marker}")
     
     result.append("")
     result.append("=" * 80)
     
-    # Chemical properties summary
-    hydrophobic = ['A', 'V', 'I', 'L', 'M', 'F', 'Y', 'W']
-    polar = ['S', 'T', 'N', 'Q', 'C']
-    charged_pos = ['K', 'R', 'H']
-    charged_neg = ['D', 'E']
-    special = ['G', 'P']
-    
-    def calc_group_pct(group):
-        return sum((aa_counts.get(aa, 0) / total_non_gap) * 100 for aa in group)
-    
+    # Chemical properties summary: one weighted bincount over the group LUT
+    counts_vec = np.zeros(256)
+    for aa, count in aa_counts.items():
+        counts_vec[ord(aa)] = count
+    group_pcts = np.bincount(GROUP_LUT, weights=counts_vec, minlength=6)[1:] / total_non_gap * 100
+
     result.append("CHEMICAL PROPERTIES DISTRIBUTION:")
     result.append("-" * 80)
-    result.append(f"Hydrophobic (A,V,I,L,M,F,Y,W):  {calc_group_pct(hydrophobic):>6.2f}%")
-    result.append(f"Polar uncharged (S,T,N,Q,C):    {calc_group_pct(polar):>6.2f}%")
-    result.append(f"Positively charged (K,R,H):     {calc_group_pct(charged_pos):>6.2f}%")
-    result.append(f"Negatively charged (D,E):       {calc_group_pct(charged_neg):>6.2f}%")
-    result.append(f"Special (G,P):                  {calc_group_pct(special):>6.2f}%")
+    for (label, _), pct in zip(AA_GROUPS, group_pcts):
+        result.append(f"{label + ':':<32}{pct:>6.2f}%")
     result.append("=" * 80)
     
     # Print to stdout
@@ -237,8 +448,7 @@ def analyze_position(msa_file, grades_file, position, output_file=None, create_f
     # Create folder structure with FASTA files
     if create_folders:
         print("\nCreating folder structure with FASTA files...")
-        results_dir = Path(msa_file).parent
-        create_fasta_files_by_amino_acid(msa_file, position, alignment_pos, pdb_position, results_dir)
+        create_fasta_files_by_amino_acid(headers, sequences, position, alignment_pos, pdb_position, results_dir, msa_bytes=msa_bytes)
     
     return {
         'position': position,
@@ -250,19 +460,86 @@ def analyze_position(msa_file, grades_file, position, output_file=None, create_f
     }
 
 
+# Shared read-only state for --all workers; set in each worker by the
+# pool initializer (and in the parent for the serial path)
+_PARALLEL_STATE = None
+
+
+def _init_parallel_state(state):
+    """Pool initializer: install the shared read-only state in a worker."""
+    global _PARALLEL_STATE
+    _PARALLEL_STATE = state
+
+
+def _analyze_position_worker(task):
+    """Render one position's report block (and folders) in a worker.
+
+    Returns (report_text, summary_dict) or None if the position does not
+    map onto the query sequence.
+    """
+    (headers, sequences, msa_bytes, counts_matrix, position_map,
+     results_dir, create_folders, total_seqs, seq_dedup, record_blobs) = _PARALLEL_STATE
+    pos, pdb_position = task
+    query_seq = sequences[0]
+    gap_code = ord('-')
+
+    alignment_pos = find_alignment_position(query_seq, pos, position_map)
+    if alignment_pos is None:
+        return None
+
+    query_aa = query_seq[alignment_pos]
+
+    # Look up the precomputed column histogram
+    byte_counts = counts_matrix[alignment_pos]
+    total_non_gap = total_seqs - int(byte_counts[gap_code])
+    aa_counts = Counter({chr(code): int(count)
+                         for code, count in enumerate(byte_counts)
+                         if count and code != gap_code})
+
+    # Batch this position's report into one write call
+    lines = []
+    lines.append("-" * 100)
+    lines.append(f"Position {pos} | PDB: {pdb_position if pdb_position else 'N/A'} | Query: {query_aa} | Coverage: {total_non_gap}/{total_seqs}")
+    lines.append("-" * 100)
+
+    # Sort by count
+    sorted_aa = sorted(aa_counts.items(), key=lambda x: x[1], reverse=True)
+
+    # Distribution with bar chart
+    for aa, count in sorted_aa:
+        percentage = (count / total_non_gap) * 100
+        marker = '*' if aa == query_aa else ' '
+        bar = BARS[min(50, int(percentage / 2))]
+        lines.append(f"{marker} {aa}  {count:>4}  {percentage:>6.2f}%  {bar}")
+
+    # Create folder structure for this position (independent per position)
+    if create_folders:
+        create_fasta_files_by_amino_acid(headers, sequences, pos, alignment_pos,
+                                         pdb_position, results_dir,
+                                         msa_bytes=msa_bytes, seq_dedup=seq_dedup,
+                                         record_blobs=record_blobs)
+
+    # top_aa/top_pct are filled in by the parent from the vectorized
+    # conservation scan over the count matrix
+    summary = {
+        'position': pos,
+        'pdb_position': pdb_position,
+        'query_aa': query_aa,
+        'total_sequences': total_seqs,
+        'non_gap': total_non_gap,
+        'distribution': dict(aa_counts),
+        'alignment_pos': alignment_pos,
+    }
+    return '\n'.join(lines) + '\n\n', summary
+
+
 def analyze_all_positions(msa_file, grades_file, output_file, create_folders=True):
     """Analyze all positions in the sequence and save to file"""
-    
-    # Read grades file to get all positions
-    positions = []
-    with open(grades_file, 'r') as f:
-        for line in f:
-            line = line.strip()
-            if line and not line.startswith('*') and not line.startswith('POS'):
-                parts = line.split()
-                if len(parts) >= 3 and parts[0].isdigit():
-                    positions.append(int(parts[0]))
-    
+
+    # Read grades file once: positions to analyze plus their PDB labels
+    pdb_by_pos = parse_grades_positions(grades_file)
+    positions = list(pdb_by_pos)
+
     if not positions:
         print("ERROR: No positions found in grades file")
         return None
@@ -275,11 +552,33 @@ def analyze_all_positions(msa_file, grades_file, output_file, create_folders=Tru
     headers, sequences = parse_msa_fasta_with_headers(msa_file)
     query_seq = sequences[0]
     total_seqs = len(sequences)
-    
+
+    # Pack the MSA into a uint8 matrix and count every column up front;
+    # the per-position loop then only formats output
+    msa_bytes = build_msa_matrix(sequences)
+    counts_matrix = count_all_positions(msa_bytes)
+
+    # Query position -> alignment index, computed once for all positions
+    position_map = build_query_position_map(query_seq)
+
     results = []
     results_dir = Path(msa_file).parent
-    
-    with open(output_file, 'w') as f:
+
+    # Positions are independent once the shared state is built: shard
+    # them across processes and write the blocks back in order
+    # Dedup identical rows and pre-encode the record payloads once;
+    # grouping classifies representatives, writes reuse the blobs
+    seq_dedup = build_sequence_dedup(msa_bytes) if create_folders else None
+    record_blobs = build_record_blobs(headers, sequences) if create_folders else None
+
+    global _PARALLEL_STATE
+    state = (headers, sequences, msa_bytes, counts_matrix, position_map,
+             results_dir, create_folders, total_seqs, seq_dedup, record_blobs)
+    _PARALLEL_STATE = state
+    tasks = [(pos, pdb_by_pos.get(pos)) for pos in positions]
+    max_workers = min(os.cpu_count() or 1, len(tasks))
+
+    with open(output_file, 'w', buffering=1 << 20) as f:
         # Write header
         f.write("=" * 100 + "\n")
         f.write("AMINO ACID DISTRIBUTION ANALYSIS - ALL POSITIONS\n")
@@ -289,73 +588,45 @@ def analyze_all_positions(msa_file, grades_file, output_file, create_folders=Tru
         f.write(f"Analysis date: {Path(output_file).stat().st_mtime}\n")
         f.write("=" * 100 + "\n\n")
         
-        # Analyze each position
-        for i, pos in enumerate(positions, 1):
-            if i % 50 == 0:
-                print(f"Progress: {i}/{len(positions)} positions analyzed...")
-            
-            # Find alignment position
-            alignment_pos = find_alignment_position(query_seq, pos)
-            if alignment_pos is None:
-                continue
-            
-            query_aa = query_seq[alignment_pos]
-            
-            # Count amino acids
-            aa_at_position = []
-            for seq in sequences:
-                aa = seq[alignment_pos]
-                if aa != '-':
-                    aa_at_position.append(aa)
-            
-            aa_counts = Counter(aa_at_position)
-            total_non_gap = len(aa_at_position)
-            
-            # Get PDB position from grades file
-            pdb_position = None
-            with open(grades_file, 'r') as gf:
-                for line in gf:
-                    if line.strip().startswith(str(pos) + '\t'):
-                        parts = line.split()
-                        if len(parts) >= 3:
-                            pdb_position = parts[2]
-                        break
-            
-            # Write to file
-            f.write("-" * 100 + "\n")
-            f.write(f"Position {pos} | PDB: {pdb_position if pdb_position else 'N/A'} | Query: {query_aa} | Coverage: {total_non_gap}/{total_seqs}\n")
-            f.write("-" * 100 + "\n")
-            
-            # Sort by count
-            sorted_aa = sorted(aa_counts.items(), key=lambda x: x[1], reverse=True)
-            
-            # Write distribution
-            for aa, count in sorted_aa:
-                percentage = (count / total_non_gap) * 100
-                marker = '*' if aa == query_aa else ' '
-                f.write(f"{marker} {aa}  {count:>4}  {percentage:>6.2f}%  ")
-                # Bar chart
-                bar = '█' * int(percentage / 2)
-                f.write(bar + '\n')
-            
-            f.write("\n")
-            
-            # Create folder structure for this position
-            if create_folders:
-                create_fasta_files_by_amino_acid(msa_file, pos, alignment_pos, pdb_position, results_dir)
-            
-            # Store for summary
-            results.append({
-                'position': pos,
-                'pdb_position': pdb_position,
-                'query_aa': query_aa,
-                'total_sequences': total_seqs,
-                'non_gap': total_non_gap,
-                'distribution': dict(aa_counts),
-                'top_aa': sorted_aa[0][0] if sorted_aa else None,
-                'top_pct': (sorted_aa[0][1] / total_non_gap * 100) if sorted_aa else 0
-            })
-        
+        # Analyze each position, in parallel when it pays off
+        if max_workers > 1:
+            chunksize = max(1, len(tasks) // (max_workers * 4))
+            # Spawn fresh workers and hand them the state through the
+            # initializer: count_all_positions has already started numba's
+            # parallel runtime in this process, which is not fork-safe,
+            # and spawned children do not inherit module globals
+            pool = ProcessPoolExecutor(max_workers=max_workers,
+                                       mp_context=multiprocessing.get_context('spawn'),
+                                       initializer=_init_parallel_state,
+                                       initargs=(state,))
+            outputs = pool.map(_analyze_position_worker, tasks, chunksize=chunksize)
+        else:
+            pool = None
+            outputs = map(_analyze_position_worker, tasks)
+
+        try:
+            for i, output in enumerate(outputs, 1):
+                if i % 50 == 0:
+                    print(f"Progress: {i}/{len(positions)} positions analyzed...")
+                if output is None:
+                    continue
+                block, summary = output
+                f.write(block)
+                results.append(summary)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+            _PARALLEL_STATE = None
+
+        # Conservation scan for the summary: one vectorized pass over the
+        # count matrix instead of per-position re-sorting
+        top_codes, top_counts, top_pcts = column_conservation(counts_matrix)
+        for r in results:
+            aln = r.pop('alignment_pos')
+            covered = int(top_counts[aln]) > 0
+            r['top_aa'] = chr(top_codes[aln]) if covered else None
+            r['top_pct'] = float(top_pcts[aln]) if covered else 0
+
         # Write summary at the end
         f.write("\n" + "=" * 100 + "\n")
         f.write("SUMMARY\n")
@@ -396,12 +667,18 @@ def analyze_all_positions(msa_file, grades_file, output_file, create_folders=Tru
 def analyze_multiple_positions(msa_file, grades_file, positions, output_file=None, create_folders=True):
     """Analyze multiple positions"""
     results = []
-    
+
+    # Parse the MSA once and share the packed matrix across all positions
+    headers, sequences = parse_msa_fasta_with_headers(msa_file)
+    msa_bytes = build_msa_matrix(sequences)
+    results_dir = Path(msa_file).parent
+
     for pos in positions:
         print(f"\n{'='*80}")
         print(f"Analyzing position {pos}...")
         print('='*80 + '\n')
-        result = analyze_position(msa_file, grades_file, pos, create_folders=create_folders)
+        result = analyze_position_parsed(headers, sequences, msa_bytes, grades_file,
+                                         pos, results_dir, create_folders=create_folders)
         if result:
             results.append(result)
         print()
@@ -457,9 +734,11 @@ Examples:
                         help='Position(s) to analyze (1-indexed, as in grades file)')
     parser.add_argument('--all', action='store_true',
                         help='Analyze all positions (saved to file automatically)')
-    parser.add_argument('-o', '--output', 
+    parser.add_argument('-o', '--output',
                         help='Output file (optional for single/multiple positions, auto-generated for --all)')
-    
+    parser.add_argument('--no-folders', action='store_true',
+                        help='Positions-only mode: skip the per-amino-acid FASTA folder creation (much faster)')
+
     args = parser.parse_args()
     
     # Check files exist
@@ -475,13 +754,16 @@ Examples:
             # Auto-generate output filename
             msa_dir = Path(args.msa).parent
             args.output = str(msa_dir / "amino_acid_distribution_all_positions.txt")
-        analyze_all_positions(args.msa, args.grades, args.output)
+        analyze_all_positions(args.msa, args.grades, args.output,
+                              create_folders=not args.no_folders)
     elif args.positions:
         # Specific positions
         if len(args.positions) == 1:
-            analyze_position(args.msa, args.grades, args.positions[0], args.output)
+            analyze_position(args.msa, args.grades, args.positions[0], args.output,
+                             create_folders=not args.no_folders)
         else:
-            analyze_multiple_positions(args.msa, args.grades, args.positions, args.output)
+            analyze_multiple_positions(args.msa, args.grades, args.positions, args.output,
+                                       create_folders=not args.no_folders)
     else:
         print("ERROR: Must specify either --all or -p/--positions")
         parser.print_help()
@@ -4,128 +4,386 @@ Check if sequences in a FASTA file are from characterized enzymes.
 Queries UniProt API to check for reviewed (Swiss-Prot) entries and protein names.
 """
 
-import re
+import os
+import shelve
+from dataclasses import dataclass
+import threading
 import time
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from pathlib import Path
 from collections import defaultdict
 
+# Optional HTTP/2 client: multiplexes the batched fallback queries over
+# one TLS connection instead of one HTTP/1.1 connection per thread
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+# Parallel batch requests: the work is pure network wait, so a handful
+# of threads over one keep-alive session overlaps the round-trips
+MAX_WORKERS = 8
+_RATE_INTERVAL = 0.1  # min seconds between request starts (~10 req/s politeness cap)
+_rate_lock = threading.Lock()
+_next_request_time = [0.0]
+
+
+def _rate_limit():
+    """Global limiter keeping all threads under the politeness cap."""
+    with _rate_lock:
+        now = time.monotonic()
+        wait = _next_request_time[0] - now
+        _next_request_time[0] = max(now, _next_request_time[0]) + _RATE_INTERVAL
+    if wait > 0:
+        time.sleep(wait)
+
+
+def _make_session():
+    """One pooled session with retries for all UniProt requests."""
+    session = requests.Session()
+    retry = Retry(total=5, backoff_factor=0.5,
+                  status_forcelist=[429, 500, 502, 503, 504])
+    session.mount("https://", HTTPAdapter(pool_connections=16, pool_maxsize=16,
+                                          max_retries=retry))
+    # TSV compresses ~5-10x; ask for gzip explicitly so every endpoint
+    # (including the ID-mapping stream) sends a compressed body that
+    # urllib3 decompresses transparently. A blanket Accept header is
+    # deliberately not set: the job run/status endpoints speak JSON and
+    # the format=tsv param already selects the result representation
+    session.headers['Accept-Encoding'] = 'gzip'
+    return session
+
+
+def _make_http2_client():
+    """HTTP/2 client for multiplexed batch GETs, or None if unavailable.
+
+    The sync httpx.Client is thread-safe, so the existing thread pool
+    keeps driving requests while all of them share a single TLS
+    connection. Requires the httpx[http2] extra; any import-time or
+    setup failure falls back to the requests session.
+    """
+    if httpx is None:
+        return None
+    try:
+        return httpx.Client(
+            http2=True, timeout=30,
+            limits=httpx.Limits(max_connections=1, max_keepalive_connections=1))
+    except ImportError:  # http2=True without the h2 package
+        return None
+
+# Persistent cache of resolved accessions so repeat runs skip HTTP entirely
+CACHE_DIR = Path.home() / ".cache" / "consurf_uniprot"
+CACHE_TTL = 30 * 24 * 3600  # seconds; re-query entries older than 30 days
+
+
+def _open_cache():
+    """Open the on-disk accession cache; returns None if unavailable."""
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        return shelve.open(str(CACHE_DIR / "uniprot_cache"))
+    except OSError:
+        return None
+
 def extract_uniprot_ids(fasta_file):
-    """Extract UniProt IDs from FASTA headers."""
+    """Extract UniProt IDs from FASTA headers.
+
+    Headers have the rigid UniProt shape >db|ACC|NAME..., so the
+    accession is simply the field between the first two pipes; a plain
+    bytes split avoids regex machinery entirely. Returns a set — the
+    callers merge or membership-test the IDs, and report ordering is
+    imposed by generate_report, so sorting here would be wasted.
+    """
     ids = set()
-    with open(fasta_file) as f:
+    with open(fasta_file, 'rb', buffering=1 << 20) as f:
         for line in f:
-            if line.startswith('>'):
-                # Format: >tr|A0ABZ0W6E1|A0ABZ0W6E1_9BACT_start_73_end_462_Evalue_1.1e-09
-                match = re.search(r'\|([A-Z0-9]+)\|', line)
-                if match:
-                    ids.add(match.group(1))
-    return sorted(ids)
-
-def query_uniprot_batch(ids, batch_size=100):
+            if line[:1] == b'>':
+                try:
+                    _, acc, _ = line.split(b'|', 2)
+                except ValueError:  # header without the |ACC| fields
+                    continue
+                ids.add(acc.decode('ascii'))
+    return ids
+
+@dataclass(slots=True)
+class Entry:
+    """One resolved UniProt accession.
+
+    Slotted so tens of thousands of entries cost a fixed attribute table
+    instead of a per-entry dict; attribute reads in the report loops are
+    C-level offset loads. The on-disk cache keeps storing plain dicts,
+    so cached data stays readable across versions and entry points.
+    """
+    reviewed: bool
+    protein_name: str
+    organism: str
+    ec: str | None
+    gene: str | None
+    length: str
+    pubmed_ids: tuple
+    pub_count: int
+
+
+UNIPROT_SEARCH_URL = "https://rest.uniprot.org/uniprotkb/search"
+IDMAPPING_RUN_URL = "https://rest.uniprot.org/idmapping/run"
+IDMAPPING_STATUS_URL = "https://rest.uniprot.org/idmapping/status/{}"
+IDMAPPING_RESULTS_URL = "https://rest.uniprot.org/idmapping/uniprotkb/results/stream/{}"
+UNIPROT_FIELDS = 'accession,reviewed,protein_name,organism_name,ec,gene_names,length,lit_pubmed_id'
+
+
+def _parse_tsv(lines, results, cache, need_pmids=True):
+    """Parse UniProt TSV lines (bytes) into the results dict (and the cache).
+
+    Accepts any iterable of raw byte lines (including a streaming
+    response.iter_lines). The TSV is unquoted, so a plain tab split is
+    exact; working on bytes and decoding only the handful of stored
+    fields skips UTF-8-decoding the whole multi-megabyte body. Locates
+    the accession ('Entry') column from the header so both the search
+    output and the ID-mapping output (which prepends a 'From' column)
+    parse identically.
+    """
+    it = iter(lines)
+    header = next(it, None)
+    if not header:
+        return
+    columns = header.rstrip(b'\r\n').split(b'\t')
+    offset = columns.index(b'Entry') if b'Entry' in columns else 0
+
+    for line in it:
+        parts = line.rstrip(b'\r\n').split(b'\t')[offset:]
+        if len(parts) >= 8:
+            accession = parts[0].decode('ascii')
+            # Parse PubMed IDs (semicolon separated); when the caller
+            # only needs the count, skip materializing the ID strings
+            pubmed_ids = ()
+            if need_pmids and parts[7]:
+                pubmed_ids = tuple(pid.strip().decode('ascii')
+                                   for pid in parts[7].split(b';') if pid.strip())
+                pub_count = len(pubmed_ids)
+            else:
+                pub_count = parts[7].count(b';') + 1 if parts[7] else 0
+
+            fields = {
+                'reviewed': parts[1] == b'reviewed',
+                'protein_name': parts[2].decode('utf-8'),
+                'organism': parts[3].decode('utf-8'),
+                'ec': parts[4].decode('ascii') if parts[4] else None,
+                'gene': parts[5].decode('utf-8') if parts[5] else None,
+                'length': parts[6].decode('ascii'),
+                'pubmed_ids': pubmed_ids,
+                'pub_count': pub_count
+            }
+            results[accession] = Entry(**fields)
+            if cache is not None:
+                cache[accession] = (time.time(), fields)
+
+
+def _query_idmapping(session, ids, results, cache, need_pmids=True):
+    """Resolve all accessions through one bulk ID-mapping job.
+
+    Submits a single POST for the whole ID list, polls the job status,
+    then streams the TSV results — one job instead of O(N/100) search
+    calls. Returns True on success.
+    """
+    _rate_limit()
+    response = session.post(IDMAPPING_RUN_URL,
+                            data={'from': 'UniProtKB_AC-ID', 'to': 'UniProtKB',
+                                  'ids': ','.join(ids)},
+                            timeout=30)
+    response.raise_for_status()
+    job_id = response.json().get('jobId')
+    if not job_id:
+        return False
+
+    while True:
+        _rate_limit()
+        status = session.get(IDMAPPING_STATUS_URL.format(job_id), timeout=30)
+        status.raise_for_status()
+        job_status = status.json().get('jobStatus')
+        if job_status in ('NEW', 'RUNNING'):
+            time.sleep(1)
+            continue
+        if job_status in (None, 'FINISHED'):
+            break
+        print(f"  Warning: ID-mapping job ended with status {job_status}")
+        return False
+
+    _rate_limit()
+    response = session.get(IDMAPPING_RESULTS_URL.format(job_id),
+                           params={'format': 'tsv', 'fields': UNIPROT_FIELDS},
+                           timeout=120, stream=True)
+    response.raise_for_status()
+    # Stream the raw body line by line instead of materializing it
+    _parse_tsv(response.iter_lines(), results, cache, need_pmids)
+    return True
+
+
+def query_uniprot_batch(ids, batch_size=100, need_pmids=True):
     """
     Query UniProt REST API for protein information.
     Returns dict with ID -> protein info.
     """
     results = {}
-    base_url = "https://rest.uniprot.org/uniprotkb/search"
-    
-    # Process in batches
-    for i in range(0, len(ids), batch_size):
-        batch = ids[i:i+batch_size]
+
+    # Serve previously resolved accessions from the persistent cache
+    cache = _open_cache()
+    missing = list(ids)
+    if cache is not None:
+        now = time.time()
+        missing = []
+        for id in ids:
+            entry = cache.get(id)
+            if entry and now - entry[0] < CACHE_TTL:
+                fields = entry[1]
+                # A count-only run may have cached entries without the ID
+                # strings; re-query those when the IDs are actually needed
+                if need_pmids and fields['pub_count'] and not fields['pubmed_ids']:
+                    missing.append(id)
+                    continue
+                results[id] = Entry(**fields)
+            else:
+                missing.append(id)
+        if len(results):
+            print(f"  {len(results)} IDs served from cache, querying {len(missing)}")
+    if not missing:
+        if cache is not None:
+            cache.close()
+        return results
+
+    session = _make_session()
+
+    # Preferred path: one bulk ID-mapping job for the whole list
+    print(f"  Submitting ID-mapping job for {len(missing)} IDs...")
+    try:
+        if _query_idmapping(session, missing, results, cache, need_pmids):
+            if cache is not None:
+                cache.close()
+            return results
+    except (requests.RequestException, ValueError) as e:
+        print(f"  Warning: ID-mapping query failed: {e}")
+    print("  Falling back to batched search queries...")
+
+    # Fallback: fetch search batches in parallel; with httpx available
+    # the threads multiplex over one HTTP/2 connection, otherwise they
+    # share the pooled HTTP/1.1 session. Responses are parsed (and
+    # cached) in the main thread as they complete
+    batches = [missing[i:i+batch_size] for i in range(0, len(missing), batch_size)]
+    client = _make_http2_client()
+    transport = "HTTP/2 multiplexed" if client is not None else "parallel"
+    print(f"  Querying {len(batches)} batch(es) with up to {MAX_WORKERS} {transport} requests...")
+
+    def fetch(batch):
         query = " OR ".join([f"accession:{id}" for id in batch])
-        
         params = {
             'query': query,
             'format': 'tsv',
-            'fields': 'accession,reviewed,protein_name,organism_name,ec,gene_names,length,lit_pubmed_id',
+            'fields': UNIPROT_FIELDS,
             'size': batch_size
         }
-        
-        print(f"  Querying batch {i//batch_size + 1}/{(len(ids)-1)//batch_size + 1}...")
-        
-        try:
-            response = requests.get(base_url, params=params, timeout=30)
-            response.raise_for_status()
-            
-            # Parse TSV response
-            lines = response.text.strip().split('\n')
-            if len(lines) > 1:  # Skip header
-                for line in lines[1:]:
-                    parts = line.split('\t')
-                    if len(parts) >= 8:
-                        accession = parts[0]
-                        # Parse PubMed IDs (semicolon separated)
-                        pubmed_ids = []
-                        if parts[7]:
-                            pubmed_ids = [pid.strip() for pid in parts[7].split(';') if pid.strip()]
-                        
-                        results[accession] = {
-                            'reviewed': parts[1] == 'reviewed',
-                            'protein_name': parts[2],
-                            'organism': parts[3],
-                            'ec': parts[4] if parts[4] else None,
-                            'gene': parts[5] if parts[5] else None,
-                            'length': parts[6],
-                            'pubmed_ids': pubmed_ids,
-                            'pub_count': len(pubmed_ids)
-                        }
-            
-            # Rate limiting - be nice to UniProt
-            time.sleep(0.5)
-            
-        except requests.RequestException as e:
-            print(f"  Warning: Batch query failed: {e}")
-            continue
-    
+        _rate_limit()  # be nice to UniProt
+        response = (client or session).get(UNIPROT_SEARCH_URL, params=params,
+                                           timeout=30)
+        response.raise_for_status()
+        return response.content
+
+    http_errors = (requests.RequestException,) if client is None else (httpx.HTTPError,)
+    with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(batches))) as pool:
+        futures = [pool.submit(fetch, batch) for batch in batches]
+        for done, future in enumerate(as_completed(futures), 1):
+            print(f"  Batch {done}/{len(batches)} done")
+            try:
+                data = future.result()
+            except http_errors as e:
+                print(f"  Warning: Batch query failed: {e}")
+                continue
+            _parse_tsv(data.splitlines(), results, cache, need_pmids)
+
+    if client is not None:
+        client.close()
+    if cache is not None:
+        cache.close()
     return results
 
-def generate_report(ids, results, detailed=False):
-    """Generate a text report from analysis results."""
-    output_lines = []
-    output_lines.append("=" * 80)
-    output_lines.append("ENZYME CHARACTERIZATION ANALYSIS")
-    output_lines.append("=" * 80)
-    output_lines.append(f"Total sequences: {len(ids)}")
-    output_lines.append(f"Sequences with UniProt data: {len(results)}")
-    output_lines.append("")
-    
+def _summary_counts(infos):
+    """Tally reviewed/EC/publication stats in one pass over the entries."""
+    reviewed = with_ec = with_pubs = 0
+    for info in infos:
+        if info.reviewed:
+            reviewed += 1
+        if info.ec:
+            with_ec += 1
+        if info.pub_count > 0:
+            with_pubs += 1
+    return reviewed, with_ec, with_pubs
+
+
+def _format_entry(acc, info, detailed):
+    """Render the report block for one accession as a single string."""
+    lines = [
+        f"{acc}\n",
+        f"  Name: {info.protein_name}\n",
+        f"  Organism: {info.organism}\n",
+        f"  Reviewed: {'Yes' if info.reviewed else 'No'}\n",
+    ]
+    if info.ec:
+        lines.append(f"  EC: {info.ec}\n")
+    if info.gene:
+        lines.append(f"  Gene: {info.gene}\n")
+    lines.append(f"  Length: {info.length} aa\n")
+    lines.append(f"  Publications: {info.pub_count}\n")
+    if detailed and info.pubmed_ids:
+        pubmed_display = info.pubmed_ids[:10]
+        lines.append(f"    PubMed IDs: {', '.join(pubmed_display)}\n")
+        if info.pub_count > 10:
+            lines.append(f"    ... and {info.pub_count - 10} more\n")
+    lines.append("\n")
+    return ''.join(lines)
+
+
+def generate_report(ids, results, out, detailed=False, blocks=None):
+    """Write a text report from analysis results to a file-like object.
+
+    Streams each line straight into the (buffered) output instead of
+    accumulating the whole report in memory and joining it. A given
+    accession renders identically in every report, so callers writing
+    many reports can pass `blocks` (accession -> pre-rendered block) to
+    format each entry once globally instead of once per file. `results`
+    may be a superset of `ids` (the global resolution dict); only
+    entries for `ids` are written, so callers need not build per-file
+    filtered dicts.
+    """
+    present = sorted(acc for acc in ids if acc in results)
+
+    write = out.write
+    write("=" * 80 + "\n")
+    write("ENZYME CHARACTERIZATION ANALYSIS\n")
+    write("=" * 80 + "\n")
+    write(f"Total sequences: {len(ids)}\n")
+    write(f"Sequences with UniProt data: {len(present)}\n")
+    write("\n")
+
     # Count statistics
-    reviewed_count = sum(1 for info in results.values() if info['reviewed'])
-    with_ec = sum(1 for info in results.values() if info['ec'])
-    with_pubs = sum(1 for info in results.values() if info['pub_count'] > 0)
-    
-    output_lines.append("SUMMARY STATISTICS")
-    output_lines.append("-" * 80)
-    output_lines.append(f"Reviewed (Swiss-Prot): {reviewed_count}")
-    output_lines.append(f"With EC number: {with_ec}")
-    output_lines.append(f"With publications: {with_pubs}")
-    output_lines.append("")
-    
+    reviewed_count, with_ec, with_pubs = _summary_counts(results[acc] for acc in present)
+
+    write("SUMMARY STATISTICS\n")
+    write("-" * 80 + "\n")
+    write(f"Reviewed (Swiss-Prot): {reviewed_count}\n")
+    write(f"With EC number: {with_ec}\n")
+    write(f"With publications: {with_pubs}\n")
+    write("\n")
+
     # List all sequences with their information
-    output_lines.append("SEQUENCE INFORMATION")
-    output_lines.append("-" * 80)
-    
-    for acc in sorted(results.keys()):
-        info = results[acc]
-        output_lines.append(f"{acc}")
-        output_lines.append(f"  Name: {info['protein_name']}")
-        output_lines.append(f"  Organism: {info['organism']}")
-        output_lines.append(f"  Reviewed: {'Yes' if info['reviewed'] else 'No'}")
-        if info['ec']:
-            output_lines.append(f"  EC: {info['ec']}")
-        if info['gene']:
-            output_lines.append(f"  Gene: {info['gene']}")
-        output_lines.append(f"  Length: {info['length']} aa")
-        output_lines.append(f"  Publications: {info['pub_count']}")
-        if detailed and info['pubmed_ids']:
-            pubmed_display = info['pubmed_ids'][:10]
-            output_lines.append(f"    PubMed IDs: {', '.join(pubmed_display)}")
-            if info['pub_count'] > 10:
-                output_lines.append(f"    ... and {info['pub_count'] - 10} more")
-        output_lines.append("")
-    
-    return '\n'.join(output_lines)
+    write("SEQUENCE INFORMATION\n")
+    write("-" * 80 + "\n")
+
+    if blocks is not None:
+        for acc in present:
+            write(blocks[acc])
+    else:
+        for acc in present:
+            write(_format_entry(acc, results[acc], detailed))
 
 def analyze_single_fasta(fasta_file, output_file=None, detailed=False):
     """Analyze a single FASTA file."""
@@ -136,22 +394,36 @@ def analyze_single_fasta(fasta_file, output_file=None, detailed=False):
     ids = extract_uniprot_ids(fasta_file)
     print(f"Found {len(ids)} unique UniProt IDs")
     
-    results = query_uniprot_batch(ids)
+    results = query_uniprot_batch(ids, need_pmids=detailed)
     print(f"Retrieved information for {len(results)}/{len(ids)} sequences")
     
-    report = generate_report(ids, results, detailed)
-    
     # Determine output file location
     if output_file is None:
         # Place report in same directory as FASTA file
         fasta_path = Path(fasta_file)
         output_file = fasta_path.parent / "enzyme_characterization_report.txt"
-    
-    Path(output_file).write_text(report)
+
+    with open(output_file, 'w', buffering=1 << 20) as out:
+        generate_report(ids, results, out, detailed)
     print(f"\n✓ Report saved to: {output_file}")
     
     return results
 
+def _find_fasta_files(root):
+    """Yield every sequences.fasta path under root via os.scandir.
+
+    Path.glob('**/...') builds a PurePath and stats per directory entry;
+    scandir recursion reuses the dirent type info and only constructs
+    Path objects for actual matches.
+    """
+    with os.scandir(root) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                yield from _find_fasta_files(entry.path)
+            elif entry.name == 'sequences.fasta':
+                yield Path(entry.path)
+
+
 def analyze_all_fastas(base_dir, detailed=False):
     """Find and analyze all sequences.fasta files in amino_acids_analysis_results.
     Optimized: queries UniProt once for all unique IDs across all files."""
@@ -163,7 +435,7 @@ def analyze_all_fastas(base_dir, detailed=False):
         return 1
     
     # Find all sequences.fasta files
-    fasta_files = list(analysis_dir.glob("**/sequences.fasta"))
+    fasta_files = list(_find_fasta_files(analysis_dir))
     
     if not fasta_files:
         print(f"No sequences.fasta files found in {analysis_dir}")
@@ -174,19 +446,25 @@ def analyze_all_fastas(base_dir, detailed=False):
     print("PHASE 1: Collecting all UniProt IDs from all FASTA files")
     print('='*80)
     
-    # Collect all unique IDs and map each file to its IDs
+    # Collect all unique IDs and map each file to its IDs; extraction is
+    # pure per-file work, so scan the files across all cores
     all_ids = set()
     file_id_map = {}
-    
-    for i, fasta_file in enumerate(sorted(fasta_files), 1):
-        print(f"[{i}/{len(fasta_files)}] Scanning {fasta_file.relative_to(base_path)}")
-        try:
-            ids = extract_uniprot_ids(fasta_file)
-            file_id_map[fasta_file] = ids
-            all_ids.update(ids)
-        except Exception as e:
-            print(f"  ✗ Error reading file: {e}")
-            file_id_map[fasta_file] = []
+
+    # Sort once and precompute display paths; both phases reuse these
+    sorted_fastas = sorted(fasta_files)
+    rel = {p: p.relative_to(base_path) for p in sorted_fastas}
+    with ProcessPoolExecutor() as pool:
+        futures = [pool.submit(extract_uniprot_ids, f) for f in sorted_fastas]
+        for i, (fasta_file, future) in enumerate(zip(sorted_fastas, futures), 1):
+            print(f"[{i}/{len(fasta_files)}] Scanning {rel[fasta_file]}")
+            try:
+                ids = future.result()
+                file_id_map[fasta_file] = ids
+                all_ids.update(ids)
+            except Exception as e:
+                print(f"  ✗ Error reading file: {e}")
+                file_id_map[fasta_file] = set()
     
     print(f"\n✓ Collected {len(all_ids)} unique UniProt IDs across all files")
     
@@ -196,38 +474,39 @@ def analyze_all_fastas(base_dir, detailed=False):
     print('='*80)
     
     all_ids_sorted = sorted(all_ids)
-    all_results = query_uniprot_batch(all_ids_sorted)
+    all_results = query_uniprot_batch(all_ids_sorted, need_pmids=detailed)
     
     print(f"\n✓ Retrieved information for {len(all_results)}/{len(all_ids)} sequences")
-    
+
+    # Render each accession's report block once; files share many IDs,
+    # so per-file report work collapses to dict lookups
+    blocks = {acc: _format_entry(acc, info, detailed)
+              for acc, info in all_results.items()}
+
     # Generate reports for each file using cached data
     print(f"\n{'='*80}")
     print("PHASE 3: Generating reports for each FASTA file")
     print('='*80)
     
-    for i, fasta_file in enumerate(sorted(fasta_files), 1):
-        print(f"\n[{i}/{len(fasta_files)}] Processing {fasta_file.relative_to(base_path)}")
+    for i, fasta_file in enumerate(sorted_fastas, 1):
+        print(f"\n[{i}/{len(fasta_files)}] Processing {rel[fasta_file]}")
         
         try:
             ids = file_id_map[fasta_file]
-            
-            # Filter results for this specific file
-            file_results = {id: all_results[id] for id in ids if id in all_results}
-            
-            # Generate report
-            report = generate_report(ids, file_results, detailed)
-            
-            # Save report next to FASTA file
+
+            # Generate report, streamed next to the FASTA file; the
+            # global results dict is passed as-is — generate_report
+            # filters by id, so no per-file dict is built
             output_file = fasta_file.parent / "enzyme_characterization_report.txt"
-            Path(output_file).write_text(report)
-            
+            with open(output_file, 'w', buffering=1 << 20) as out:
+                generate_report(ids, all_results, out, detailed, blocks)
+
             # Count statistics for display
-            reviewed = sum(1 for info in file_results.values() if info['reviewed'])
-            with_ec = sum(1 for info in file_results.values() if info['ec'])
-            with_pubs = sum(1 for info in file_results.values() if info['pub_count'] > 0)
-            
-            print(f"  ✓ Report saved: {output_file.relative_to(base_path)}")
-            print(f"    Total: {len(file_results)}, Reviewed: {reviewed}, With EC: {with_ec}, With pubs: {with_pubs}")
+            present = [all_results[i] for i in ids if i in all_results]
+            reviewed, with_ec, with_pubs = _summary_counts(present)
+
+            print(f"  ✓ Report saved: {rel[fasta_file].parent / output_file.name}")
+            print(f"    Total: {len(present)}, Reviewed: {reviewed}, With EC: {with_ec}, With pubs: {with_pubs}")
             
         except Exception as e:
             print(f"  ✗ Error generating report: {e}")
@@ -265,9 +544,8 @@ def main():
         results = analyze_single_fasta(fasta_file, args.output, args.detailed)
         
         # Count statistics
-        reviewed = sum(1 for info in results.values() if info['reviewed'])
-        with_pubs = sum(1 for info in results.values() if info['pub_count'] > 0)
-        
+        reviewed, _, with_pubs = _summary_counts(results.values())
+
         # Return status
         if reviewed > 0:
             print(f"\n✓ Found {reviewed} reviewed (Swiss-Prot) entry/entries")
@@ -16,8 +16,8 @@ import os
 import numpy as np
 import pandas as pd
 from Bio import AlignIO
-from collections import Counter
-from itertools import combinations
+from itertools import chain, combinations
+from math import comb
 import matplotlib
 matplotlib.use('Agg')
 import matplotlib.pyplot as plt
@@ -27,9 +27,35 @@ from typing import Dict, Tuple, List, Optional, Set
 import warnings
 warnings.filterwarnings('ignore')
 
+# Optional numba kernel for the triplet search; the Counter-free numpy
+# path below remains the fallback when numba is not installed
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+    prange = range
+
 
 AMINO_ACIDS = list('ACDEFGHIKLMNPQRSTVWY')
 
+# Integer alphabet: A..Y -> 0..19, everything else (gaps, X, B, Z...) -> 20.
+# Encoding columns once means joint distributions come from np.bincount over
+# contiguous int8 codes instead of hashing Python strings into Counters.
+_GAP_CODE = 20
+_AA_LUT = np.full(256, _GAP_CODE, np.int8)
+_AA_LUT[np.frombuffer(b'ACDEFGHIKLMNPQRSTVWY', np.uint8)] = np.arange(20, dtype=np.int8)
+
+
+def encode_residues(chars: np.ndarray) -> np.ndarray:
+    """Encode a '<U1' residue array (any shape) to int8 codes, gap = 20.
+
+    Already-encoded int8 input passes through untouched, so callers can
+    encode an alignment once and hand the codes to any function here.
+    """
+    if chars.dtype == np.int8:
+        return chars
+    return _AA_LUT[chars.astype('S1').view(np.uint8)].reshape(chars.shape)
+
 
 def get_amino_acid_pairs(alignment_array: np.ndarray, pos_i_idx: int, pos_j_idx: int, 
                          top_n: int = 5) -> List[Tuple[str, str, float, int]]:
@@ -38,28 +64,31 @@ def get_amino_acid_pairs(alignment_array: np.ndarray, pos_i_idx: int, pos_j_idx:
     
     Returns: [(aa_i, aa_j, frequency, count), ...]
     """
-    col_i = alignment_array[:, pos_i_idx]
-    col_j = alignment_array[:, pos_j_idx]
-    
-    # Filter gaps
-    mask = (col_i != '-') & (col_j != '-')
-    col_i_clean = col_i[mask]
-    col_j_clean = col_j[mask]
-    
-    if len(col_i_clean) == 0:
+    ci = encode_residues(alignment_array[:, pos_i_idx])
+    cj = encode_residues(alignment_array[:, pos_j_idx])
+
+    # Filter gaps and pack each residue pair into one code in 0..399
+    mask = (ci < _GAP_CODE) & (cj < _GAP_CODE)
+    packed = ci[mask].astype(np.int32) * 20 + cj[mask]
+
+    total = packed.size
+    if total == 0:
         return []
-    
-    # Count pairs
-    pairs = list(zip(col_i_clean, col_j_clean))
-    pair_counts = Counter(pairs)
-    total = len(pairs)
-    
-    # Sort by frequency
-    sorted_pairs = sorted(pair_counts.items(), key=lambda x: x[1], reverse=True)[:top_n]
-    
+
+    # One bincount replaces tuple hashing into a Counter; stable argsort
+    # ranks by count with alphabetical order among ties
+    counts = np.bincount(packed, minlength=400)
+    order = np.argsort(-counts, kind='stable')[:top_n]
+
     # Format as (aa_i, aa_j, frequency, count)
-    result = [(aa_i, aa_j, count/total, count) for (aa_i, aa_j), count in sorted_pairs]
-    
+    result = []
+    for code in order:
+        count = int(counts[code])
+        if count == 0:
+            break
+        result.append((AMINO_ACIDS[code // 20], AMINO_ACIDS[code % 20],
+                       count / total, count))
+
     return result
 
 
@@ -68,148 +97,387 @@ def compute_mutual_information(col_i: np.ndarray, col_j: np.ndarray) -> float:
     Compute mutual information between two positions.
     MI(X,Y) = Σ p(x,y) log(p(x,y) / (p(x)p(y)))
     """
-    # Filter gaps
-    mask = (col_i != '-') & (col_j != '-')
-    col_i_clean = col_i[mask]
-    col_j_clean = col_j[mask]
-    
-    if len(col_i_clean) == 0:
+    # Filter gaps (and unknown residues) on the integer codes
+    ci = encode_residues(col_i)
+    cj = encode_residues(col_j)
+    mask = (ci < _GAP_CODE) & (cj < _GAP_CODE)
+    ci = ci[mask]
+    cj = cj[mask]
+
+    total = ci.size
+    if total == 0:
         return 0.0
-    
-    # Compute frequencies
-    count_i = Counter(col_i_clean)
-    count_j = Counter(col_j_clean)
-    count_ij = Counter(zip(col_i_clean, col_j_clean))
-    
-    total = len(col_i_clean)
-    
-    mi = 0.0
-    for (aa_i, aa_j), n_ij in count_ij.items():
-        p_ij = n_ij / total
-        p_i = count_i[aa_i] / total
-        p_j = count_j[aa_j] / total
-        
-        if p_ij > 0 and p_i > 0 and p_j > 0:
-            mi += p_ij * np.log2(p_ij / (p_i * p_j))
-    
+
+    # Joint histogram over the 20x20 alphabet in a single bincount;
+    # marginals are just its row/column sums
+    joint = np.bincount(ci.astype(np.int32) * 20 + cj, minlength=400).reshape(20, 20)
+    count_i = joint.sum(axis=1)
+    count_j = joint.sum(axis=0)
+
+    # One vectorized pass over the 400 cells; empty cells contribute 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = joint * total / np.outer(count_i, count_j)
+        mi = np.sum(joint * np.log2(ratio, where=joint > 0,
+                                    out=np.zeros_like(ratio))) / total
+
     return max(0, mi)  # MI is non-negative
 
 
+def filter_invariant_columns(alignment_array: np.ndarray, positions: List[int],
+                             min_entropy: float = 0.0) -> Tuple[np.ndarray, List[int]]:
+    """
+    Drop columns whose residue entropy is at or below min_entropy.
+
+    Neither MI nor covariance carries signal for (near-)invariant
+    columns, yet they inflate every pairwise and triplet loop. With the
+    default threshold only strictly invariant columns (H == 0) go;
+    raising it trims near-invariant ones too.
+    """
+    enc = encode_residues(alignment_array)
+    n_cols = enc.shape[1]
+    # Per-column residue histograms from one flat bincount
+    codes = enc.astype(np.int64) + 21 * np.arange(n_cols)
+    hist = np.bincount(codes.ravel(), minlength=21 * n_cols).reshape(n_cols, 21)[:, :20]
+    totals = hist.sum(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        p = hist / totals[:, None]
+        entropy = -np.sum(p * np.log2(p, where=p > 0, out=np.zeros_like(p)),
+                          axis=1, where=p > 0)
+    entropy = np.where(totals > 0, entropy, 0.0)
+
+    keep = entropy > min_entropy
+    if not keep.all():
+        print(f"  Dropped {int((~keep).sum())} invariant/low-entropy columns "
+              f"(H <= {min_entropy})")
+    kept_positions = [pos for pos, k in zip(positions, keep) if k]
+    return alignment_array[:, keep], kept_positions
+
+
+if njit is not None:
+    @njit(parallel=True, cache=True)
+    def _pairwise_mi_jit(enc):  # pragma: no cover
+        n_seq, n_cols = enc.shape
+        mi = np.zeros((n_cols, n_cols))
+        for i in prange(n_cols):
+            for j in range(i + 1, n_cols):
+                joint = np.zeros((20, 20), np.int64)
+                total = 0
+                for s in range(n_seq):
+                    a, b = enc[s, i], enc[s, j]
+                    if a < 20 and b < 20:
+                        joint[a, b] += 1
+                        total += 1
+                if total == 0:
+                    continue
+                count_i = np.zeros(20, np.int64)
+                count_j = np.zeros(20, np.int64)
+                for a in range(20):
+                    for b in range(20):
+                        count_i[a] += joint[a, b]
+                        count_j[b] += joint[a, b]
+                v = 0.0
+                for a in range(20):
+                    for b in range(20):
+                        cnt = joint[a, b]
+                        if cnt > 0:
+                            v += (cnt / total) * np.log2(
+                                cnt * total / (count_i[a] * count_j[b]))
+                if v > 0.0:
+                    mi[i, j] = v
+                    mi[j, i] = v
+        return mi
+else:
+    _pairwise_mi_jit = None
+
+
+def pairwise_mi_matrix(alignment_array: np.ndarray, block: int = 32) -> np.ndarray:
+    """
+    Compute the full L x L pairwise MI matrix in one shot.
+
+    With numba, rows of the matrix are computed independently across
+    cores (prange over the outer column, bincount-style inner loop with
+    no large intermediate). Otherwise, one-hot encoding the alignment
+    to (N, L, 20) turns every per-pair joint histogram into a single
+    einsum contraction (BLAS-backed matmuls), tiled over column blocks
+    so the (block, L, 20, 20) intermediate stays bounded. Either way
+    the diagonal is left at zero — MI of a column with itself is just
+    its entropy and would pollute partner rankings.
+    """
+    enc = encode_residues(alignment_array)
+    if _pairwise_mi_jit is not None:
+        # float32 is ample for scores ranked and printed to 6 decimals,
+        # and halves the cached matrix
+        return _pairwise_mi_jit(enc).astype(np.float32)
+
+    n_cols = enc.shape[1]
+    # Gap rows one-hot to all-zero, so each pair's joint automatically
+    # excludes sequences gapped at either position. float32 halves the
+    # bandwidth of the contraction and doubles SIMD throughput; counts
+    # stay exact well past any realistic alignment depth
+    one_hot = (enc[:, :, None] == np.arange(20, dtype=np.int8)).astype(np.float32)
+
+    mi = np.zeros((n_cols, n_cols), dtype=np.float32)
+    for start in range(0, n_cols, block):
+        stop = min(start + block, n_cols)
+        joint = np.einsum('nia,njb->ijab', one_hot[:, start:stop], one_hot,
+                          optimize=True)
+        n_ij = joint.sum(axis=(2, 3))
+        p_i = joint.sum(axis=3)
+        p_j = joint.sum(axis=2)
+        denom = p_i[:, :, :, None] * p_j[:, :, None, :]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratio = joint * n_ij[:, :, None, None] / denom
+            terms = joint * np.log2(ratio, where=joint > 0,
+                                    out=np.zeros_like(ratio))
+        np.divide(terms.sum(axis=(2, 3)), n_ij, where=n_ij > 0,
+                  out=mi[start:stop])
+    mi = np.maximum(mi, 0.0)  # MI is non-negative
+    np.fill_diagonal(mi, 0.0)
+    return mi
+
+
 def compute_triplet_mi(alignment_array: np.ndarray, pos_i: int, pos_j: int, pos_k: int) -> float:
     """
     Compute 3-way mutual information.
     MI(X,Y,Z) = Σ p(x,y,z) log(p(x,y,z) / (p(x)p(y)p(z)))
     """
-    col_i = alignment_array[:, pos_i]
-    col_j = alignment_array[:, pos_j]
-    col_k = alignment_array[:, pos_k]
-    
+    ci = encode_residues(alignment_array[:, pos_i])
+    cj = encode_residues(alignment_array[:, pos_j])
+    ck = encode_residues(alignment_array[:, pos_k])
+
     # Filter gaps
-    mask = (col_i != '-') & (col_j != '-') & (col_k != '-')
-    col_i_clean = col_i[mask]
-    col_j_clean = col_j[mask]
-    col_k_clean = col_k[mask]
-    
-    if len(col_i_clean) < 10:  # Need enough data
+    mask = (ci < _GAP_CODE) & (cj < _GAP_CODE) & (ck < _GAP_CODE)
+    ci = ci[mask]
+    cj = cj[mask]
+    ck = ck[mask]
+
+    total = ci.size
+    if total < 10:  # Need enough data
         return 0.0
-    
-    # Compute frequencies
-    count_i = Counter(col_i_clean)
-    count_j = Counter(col_j_clean)
-    count_k = Counter(col_k_clean)
-    count_ijk = Counter(zip(col_i_clean, col_j_clean, col_k_clean))
-    
-    total = len(col_i_clean)
-    
-    mi3 = 0.0
-    for (aa_i, aa_j, aa_k), n_ijk in count_ijk.items():
-        p_ijk = n_ijk / total
-        p_i = count_i[aa_i] / total
-        p_j = count_j[aa_j] / total
-        p_k = count_k[aa_k] / total
-        
-        if p_ijk > 0 and p_i > 0 and p_j > 0 and p_k > 0:
-            mi3 += p_ijk * np.log2(p_ijk / (p_i * p_j * p_k))
-    
+
+    # Joint histogram over the 20^3 alphabet via base-20 packed codes
+    idx = (ci.astype(np.int32) * 20 + cj) * 20 + ck
+    joint = np.bincount(idx, minlength=8000).reshape(20, 20, 20)
+    count_i = joint.sum(axis=(1, 2))
+    count_j = joint.sum(axis=(0, 2))
+    count_k = joint.sum(axis=(0, 1))
+
+    # One vectorized pass: p_ijk/(p_i*p_j*p_k) == n_ijk*total^2/(n_i*n_j*n_k)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        denom = (count_i[:, None, None] * count_j[None, :, None] *
+                 count_k[None, None, :]).astype(np.float64)
+        ratio = joint * float(total) * total / denom
+        mi3 = np.sum(joint * np.log2(ratio, where=joint > 0,
+                                     out=np.zeros_like(ratio))) / total
+
     return max(0, mi3)
 
 
-def compute_connected_triplet_mi(alignment_array: np.ndarray, pos_i: int, pos_j: int, pos_k: int) -> float:
+def compute_connected_triplet_mi(alignment_array: np.ndarray, pos_i: int, pos_j: int, pos_k: int,
+                                 pair_mi: Optional[np.ndarray] = None) -> float:
     """
     Compute connected mutual information for triplet.
     This removes pairwise correlations to focus on genuine 3-way coupling.
-    
+
     CMI(i,j,k) = MI(i,j,k) - [MI(i,j) + MI(i,k) + MI(j,k)]
+
+    Pass a precomputed `pair_mi` matrix (from pairwise_mi_matrix) when
+    scoring many triplets against one alignment: each pair is shared by
+    many triplets, so recomputing the three pairwise terms per call is
+    pure redundant work.
     """
     mi_ijk = compute_triplet_mi(alignment_array, pos_i, pos_j, pos_k)
-    
-    # Pairwise MIs
-    mi_ij = compute_mutual_information(alignment_array[:, pos_i], alignment_array[:, pos_j])
-    mi_ik = compute_mutual_information(alignment_array[:, pos_i], alignment_array[:, pos_k])
-    mi_jk = compute_mutual_information(alignment_array[:, pos_j], alignment_array[:, pos_k])
-    
+
+    # Pairwise MIs, from the cache when the caller has one
+    if pair_mi is not None:
+        mi_ij = pair_mi[pos_i, pos_j]
+        mi_ik = pair_mi[pos_i, pos_k]
+        mi_jk = pair_mi[pos_j, pos_k]
+    else:
+        mi_ij = compute_mutual_information(alignment_array[:, pos_i], alignment_array[:, pos_j])
+        mi_ik = compute_mutual_information(alignment_array[:, pos_i], alignment_array[:, pos_k])
+        mi_jk = compute_mutual_information(alignment_array[:, pos_j], alignment_array[:, pos_k])
+
     # Connected MI
     cmi = mi_ijk - (mi_ij + mi_ik + mi_jk)
-    
+
     return cmi
 
 
-def find_top_triplets(alignment_array: np.ndarray, position_indices: List[int], 
-                     position_labels: Dict[int, str], top_n: int = 20, 
-                     max_candidates: int = 100) -> List[Tuple[str, str, str, float]]:
+def _triplet_cmi_batch_py(enc, triplets, pair_mi):
+    """Connected triplet MI for each (i, j, k) row; numpy fallback."""
+    out = np.empty(len(triplets))
+    for t, (i, j, k) in enumerate(triplets):
+        ci, cj, ck = enc[:, i], enc[:, j], enc[:, k]
+        mask = (ci < _GAP_CODE) & (cj < _GAP_CODE) & (ck < _GAP_CODE)
+        ci, cj, ck = ci[mask], cj[mask], ck[mask]
+        total = ci.size
+        mi3 = 0.0
+        if total >= 10:
+            idx = (ci.astype(np.int32) * 20 + cj) * 20 + ck
+            joint = np.bincount(idx, minlength=8000).reshape(20, 20, 20)
+            count_i = joint.sum(axis=(1, 2))
+            count_j = joint.sum(axis=(0, 2))
+            count_k = joint.sum(axis=(0, 1))
+            # p_ijk/(p_i*p_j*p_k) == n_ijk*total^2/(n_i*n_j*n_k)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                denom = (count_i[:, None, None] * count_j[None, :, None] *
+                         count_k[None, None, :]).astype(np.float64)
+                ratio = joint * float(total) * total / denom
+                mi3 = np.sum(joint * np.log2(ratio, where=joint > 0,
+                                             out=np.zeros_like(ratio))) / total
+            mi3 = max(0.0, mi3)
+        out[t] = mi3 - (pair_mi[i, j] + pair_mi[i, k] + pair_mi[j, k])
+    return out
+
+
+if njit is not None:
+    @njit(parallel=True, cache=True)
+    def _triplet_cmi_batch(enc, triplets, pair_mi):  # pragma: no cover
+        n_triplets = triplets.shape[0]
+        n_seq = enc.shape[0]
+        out = np.empty(n_triplets)
+        for t in prange(n_triplets):
+            i, j, k = triplets[t, 0], triplets[t, 1], triplets[t, 2]
+            # Histogram over the full 21-state alphabet (gap included) so
+            # the per-sequence loop is branchless; gap-touching bins are
+            # simply never read back below
+            h3 = np.zeros(9261, np.int64)
+            for s in range(n_seq):
+                h3[(enc[s, i] * 21 + enc[s, j]) * 21 + enc[s, k]] += 1
+            h_i = np.zeros(20, np.int64)
+            h_j = np.zeros(20, np.int64)
+            h_k = np.zeros(20, np.int64)
+            total = 0
+            for a in range(20):
+                for b in range(20):
+                    base = (a * 21 + b) * 21
+                    for c in range(20):
+                        cnt = h3[base + c]
+                        h_i[a] += cnt
+                        h_j[b] += cnt
+                        h_k[c] += cnt
+                        total += cnt
+            mi3 = 0.0
+            if total >= 10:
+                for a in range(20):
+                    for b in range(20):
+                        base = (a * 21 + b) * 21
+                        for c in range(20):
+                            cnt = h3[base + c]
+                            if cnt > 0:
+                                denom = h_i[a] * h_j[b] * h_k[c]
+                                # p_ijk/(p_i*p_j*p_k) == cnt*total^2 / denom
+                                mi3 += (cnt / total) * np.log2(cnt * total * total / denom)
+                mi3 = max(0.0, mi3)
+            out[t] = mi3 - (pair_mi[i, j] + pair_mi[i, k] + pair_mi[j, k])
+        return out
+else:
+    _triplet_cmi_batch = None
+
+
+def find_top_triplets(alignment_array: np.ndarray, position_indices: List[int],
+                     position_labels: Dict[int, str], top_n: int = 20,
+                     max_candidates: int = 100,
+                     partner_k: Optional[int] = None,
+                     pair_mi: Optional[np.ndarray] = None) -> List[Tuple[str, str, str, float]]:
     """
     Find top covarying triplets using connected mutual information.
-    
-    Strategy: Only test triplets where all 3 pairs are in top pairwise signals.
+
+    All triplets drawn from the candidate positions are scored. Passing
+    `partner_k` enables a heuristic speedup that only tests triplets whose
+    three pairs each rank within the `partner_k` strongest MI partners of
+    one of their endpoints. This trades recall for speed: connected MI
+    subtracts the pairwise terms, so genuinely synergistic triplets can
+    have weak pairwise coupling and be pruned by this filter.
+
+    Pass `pair_mi` (a full pairwise MI matrix from pairwise_mi_matrix over
+    the same positions) to skip recomputing it here.
     """
     print(f"\nSearching for covarying triplets...")
     print(f"  Testing combinations from top {max_candidates} pairwise signals")
-    
-    # First, get top pairwise MI values
+
+    # Encode once; every stage below works on the int8 codes
     n_pos = len(position_indices)
-    pair_scores = []
-    
-    for i in range(n_pos):
-        for j in range(i+1, n_pos):
-            mi = compute_mutual_information(alignment_array[:, i], alignment_array[:, j])
-            pair_scores.append((i, j, mi))
-    
-    # Sort and get top candidates
-    pair_scores.sort(key=lambda x: x[2], reverse=True)
-    top_pairs = pair_scores[:max_candidates]
-    
+    enc = encode_residues(alignment_array[:, :n_pos])
+
+    # First, get top pairwise MI values from the vectorized MI matrix
+    # (reused from the caller when already computed)
+    mi_matrix = pairwise_mi_matrix(enc) if pair_mi is None else pair_mi
+    # Select the top max_candidates pairs with argpartition — linear in
+    # the number of pairs, with no Python-level comparisons
+    iu, ju = np.triu_indices(n_pos, k=1)
+    mi_flat = mi_matrix[iu, ju]
+    n_keep = min(max_candidates, mi_flat.size)
+    if n_keep < mi_flat.size:
+        top_idx = np.argpartition(-mi_flat, n_keep - 1)[:n_keep]
+    else:
+        top_idx = np.arange(mi_flat.size)
+
     # Build set of positions that appear in top pairs
-    candidate_positions = set()
-    for i, j, _ in top_pairs:
-        candidate_positions.add(i)
-        candidate_positions.add(j)
-    
-    candidate_list = sorted(list(candidate_positions))
+    candidate_list = sorted({int(p) for p in iu[top_idx]} |
+                            {int(p) for p in ju[top_idx]})
     print(f"  Candidate positions: {len(candidate_list)}")
     
-    # Test all triplets from candidate positions
-    triplet_scores = []
-    n_triplets = len(list(combinations(candidate_list, 3)))
+    # Test all triplets from candidate positions in one batch over the
+    # int8-encoded alignment, reusing the cached pairwise MI matrix
+    n_triplets = comb(len(candidate_list), 3)
     print(f"  Testing {n_triplets} triplet combinations...")
-    
-    tested = 0
-    for i, j, k in combinations(candidate_list, 3):
-        cmi = compute_connected_triplet_mi(alignment_array, i, j, k)
-        if cmi > 0:  # Only keep positive signals
-            aln_pos_i = position_indices[i]
-            aln_pos_j = position_indices[j]
-            aln_pos_k = position_indices[k]
-            
-            label_i = position_labels[aln_pos_i]
-            label_j = position_labels[aln_pos_j]
-            label_k = position_labels[aln_pos_k]
-            
-            triplet_scores.append((label_i, label_j, label_k, cmi))
-        
-        tested += 1
-        if tested % 1000 == 0:
-            print(f"    Progress: {tested}/{n_triplets} ({100*tested/n_triplets:.1f}%)")
-    
+
+    triplet_scores = []
+    if n_triplets:
+        # Stream the combinations straight into the index array instead
+        # of materializing C(n,3) Python tuples just to count them
+        trip_arr = np.fromiter(chain.from_iterable(combinations(candidate_list, 3)),
+                               dtype=np.int64, count=3 * n_triplets).reshape(-1, 3)
+
+        if partner_k is not None:
+            # Optional pruning: keep only triplets whose three pairs are
+            # all mutually strong, i.e. pair (i, j) counts as strong when
+            # j is among i's partner_k top MI partners (or vice versa)
+            k_part = min(partner_k, n_pos - 1)
+            top_partners = np.argsort(-mi_matrix, axis=1, kind='stable')[:, :k_part]
+            strong = np.zeros((n_pos, n_pos), dtype=bool)
+            strong[np.repeat(np.arange(n_pos), k_part), top_partners.ravel()] = True
+            strong |= strong.T
+            keep = (strong[trip_arr[:, 0], trip_arr[:, 1]] &
+                    strong[trip_arr[:, 0], trip_arr[:, 2]] &
+                    strong[trip_arr[:, 1], trip_arr[:, 2]])
+            trip_arr = trip_arr[keep]
+            if len(trip_arr) < n_triplets:
+                print(f"  Pruned {n_triplets - len(trip_arr)} triplets with weak pairwise coupling")
+
+        # Bit-pack each column's non-gap indicator into uint64 words so
+        # the three-way support count is a handful of word ANDs plus a
+        # popcount instead of three length-N boolean arrays per triplet.
+        # Triplets with support < 10 have mi3 defined as 0 and can never
+        # score positive, so drop them before the histogram pass
+        bits = np.packbits((enc < _GAP_CODE).T, axis=1, bitorder='little')
+        pad = (-bits.shape[1]) % 8
+        if pad:
+            bits = np.pad(bits, ((0, 0), (0, pad)))
+        words = np.ascontiguousarray(bits).view(np.uint64)
+        n_pruned = len(trip_arr)
+        support = np.bitwise_count(words[trip_arr[:, 0]] &
+                                   words[trip_arr[:, 1]] &
+                                   words[trip_arr[:, 2]]).sum(axis=1)
+        trip_arr = trip_arr[support >= 10]
+        if len(trip_arr) < n_pruned:
+            print(f"  Skipped {n_pruned - len(trip_arr)} triplets with insufficient gap-free rows")
+
+        if _triplet_cmi_batch is not None:
+            cmis = _triplet_cmi_batch(enc, trip_arr, mi_matrix)
+        else:
+            cmis = _triplet_cmi_batch_py(enc, trip_arr, mi_matrix)
+
+        for (i, j, k), cmi in zip(trip_arr, cmis):
+            if cmi > 0:  # Only keep positive signals
+                label_i = position_labels[position_indices[i]]
+                label_j = position_labels[position_indices[j]]
+                label_k = position_labels[position_indices[k]]
+                triplet_scores.append((label_i, label_j, label_k, cmi))
+
+
     # Sort and return top
     triplet_scores.sort(key=lambda x: x[3], reverse=True)
     print(f"  Found {len(triplet_scores)} triplets with positive signal")
@@ -231,70 +499,78 @@ def save_enhanced_top_pairs(top_pairs: List[Tuple[str, str, float]],
         label = position_labels[aln_pos]
         label_to_idx[label] = idx
     
+    # Build all lines up front and write them in one call instead of
+    # issuing a small formatted write per row
+    lines = [
+        "=" * 120,
+        f"TOP {top_n} COVARYING POSITION PAIRS (WITH AMINO ACID FREQUENCIES)",
+        "=" * 120,
+        "",
+        f"{'Rank':<6} {'Residue 1':<12} {'Residue 2':<12} {'Covariance':<12} Most Common Pairs (AA1-AA2: freq%)",
+        "-" * 120,
+    ]
+
+    # Encode the alignment once for all top pairs
+    enc = encode_residues(alignment_array)
+
+    for rank, (res1, res2, cov) in enumerate(top_pairs, 1):
+        # Get amino acid pairs
+        idx1 = label_to_idx[res1]
+        idx2 = label_to_idx[res2]
+        aa_pairs = get_amino_acid_pairs(enc, idx1, idx2, top_n=5)
+
+        # Format pairs
+        if aa_pairs:
+            pairs_str = ", ".join([f"{a1}-{a2}:{100*freq:.1f}%" for a1, a2, freq, _ in aa_pairs])
+        else:
+            pairs_str = "N/A"
+
+        lines.append(f"{rank:<6} {res1:<12} {res2:<12} {cov:<12.6f} {pairs_str}")
+
     with open(output_file, 'w') as f:
-        f.write("=" * 120 + "\n")
-        f.write(f"TOP {top_n} COVARYING POSITION PAIRS (WITH AMINO ACID FREQUENCIES)\n")
-        f.write("=" * 120 + "\n\n")
-        f.write(f"{'Rank':<6} {'Residue 1':<12} {'Residue 2':<12} {'Covariance':<12} Most Common Pairs (AA1-AA2: freq%)\n")
-        f.write("-" * 120 + "\n")
-        
-        for rank, (res1, res2, cov) in enumerate(top_pairs, 1):
-            # Get amino acid pairs
-            idx1 = label_to_idx[res1]
-            idx2 = label_to_idx[res2]
-            aa_pairs = get_amino_acid_pairs(alignment_array, idx1, idx2, top_n=5)
-            
-            # Format pairs
-            if aa_pairs:
-                pairs_str = ", ".join([f"{a1}-{a2}:{100*freq:.1f}%" for a1, a2, freq, _ in aa_pairs])
-            else:
-                pairs_str = "N/A"
-            
-            f.write(f"{rank:<6} {res1:<12} {res2:<12} {cov:<12.6f} {pairs_str}\n")
-    
+        f.write("\n".join(lines) + "\n")
+
     print(f"  Saved enhanced pairs list: {output_file}")
 
 
 def save_triplet_results(triplets: List[Tuple[str, str, str, float]], output_file: str):
     """Save triplet coevolution results."""
-    with open(output_file, 'w') as f:
-        f.write("=" * 100 + "\n")
-        f.write("TOP COVARYING TRIPLETS (3-WAY COUPLING)\n")
-        f.write("=" * 100 + "\n\n")
-        f.write("Connected MI > 0 indicates genuine 3-way coevolution beyond pairwise correlations\n\n")
-        f.write(f"{'Rank':<6} {'Residue 1':<12} {'Residue 2':<12} {'Residue 3':<12} {'Conn. MI':<12}\n")
-        f.write("-" * 100 + "\n")
-        
-        for rank, (res1, res2, res3, cmi) in enumerate(triplets, 1):
-            f.write(f"{rank:<6} {res1:<12} {res2:<12} {res3:<12} {cmi:<12.6f}\n")
-    
-    print(f"  Saved triplet analysis: {output_file}")
+    lines = [
+        "=" * 100,
+        "TOP COVARYING TRIPLETS (3-WAY COUPLING)",
+        "=" * 100,
+        "",
+        "Connected MI > 0 indicates genuine 3-way coevolution beyond pairwise correlations",
+        "",
+        f"{'Rank':<6} {'Residue 1':<12} {'Residue 2':<12} {'Residue 3':<12} {'Conn. MI':<12}",
+        "-" * 100,
+    ]
+    for rank, (res1, res2, res3, cmi) in enumerate(triplets, 1):
+        lines.append(f"{rank:<6} {res1:<12} {res2:<12} {res3:<12} {cmi:<12.6f}")
 
+    with open(output_file, 'w') as f:
+        f.write("\n".join(lines) + "\n")
 
-# Import all other functions from v2
-import importlib.util
-import sys
-
-# Load the v2 module dynamically to reuse functions
-script_dir = os.path.dirname(os.path.abspath(__file__))
-v2_path = os.path.join(script_dir, "coevolutionary_analysis_v2.py")
+    print(f"  Saved triplet analysis: {output_file}")
 
-spec = importlib.util.spec_from_file_location("coev_v2", v2_path)
-coev_v2 = importlib.util.module_from_spec(spec)
-spec.loader.exec_module(coev_v2)
 
-# Import needed functions
-read_consurf_grades = coev_v2.read_consurf_grades
-map_alignment_to_sequence = coev_v2.map_alignment_to_sequence
-read_alignment = coev_v2.read_alignment
-filter_by_gaps = coev_v2.filter_by_gaps
-compute_covariance = coev_v2.compute_covariance
-compute_covariance_matrix = coev_v2.compute_covariance_matrix
-plot_heatmap = coev_v2.plot_heatmap
-get_top_pairs = coev_v2.get_top_pairs
-plot_top_pairs = coev_v2.plot_top_pairs
-analyze_position = coev_v2.analyze_position
-save_summary_stats = coev_v2.save_summary_stats
+# Import all other functions from v2 as a regular module: the file sits
+# next to this script (whose directory is on sys.path when run
+# directly), so a plain import gets bytecode caching instead of
+# re-parsing the source through importlib on every invocation
+from coevolutionary_analysis_v2 import (
+    read_consurf_grades,
+    map_alignment_to_sequence,
+    read_alignment,
+    filter_by_gaps,
+    compute_covariance,
+    compute_covariance_matrix,
+    plot_heatmap,
+    get_top_pairs,
+    plot_top_pairs,
+    analyze_position,
+    save_summary_stats,
+)
 
 
 def main():
@@ -304,10 +580,14 @@ def main():
         print("\nOptions:")
         print("  --grades-file <file>        ConSurf grades file for residue labeling")
         print("  --max-gap-percent <value>   Max gap % (default: 50)")
+        print("  --min-entropy <value>       Drop columns with entropy <= value (default: 0)")
         print("  --top-pairs <n>             Number of top pairs (default: 50)")
         print("  --analyze-position <label>  Analyze specific residue (e.g., GLU233)")
         print("  --find-triplets             Search for 3-way coevolution (slower)")
         print("  --triplet-candidates <n>    Max positions to test for triplets (default: 100)")
+        print("  --triplet-partner-k <n>     Prune triplets with weak pairwise MI, keeping the")
+        print("                              top n partners per position (default: no pruning;")
+        print("                              faster but can miss synergistic triplets)")
         sys.exit(1)
     
     msa_file = sys.argv[1]
@@ -316,10 +596,12 @@ def main():
     # Parse options
     grades_file = None
     max_gap_pct = 50.0
+    min_entropy = 0.0
     top_n = 50
     analyze_positions = []
     find_triplets = False
     triplet_candidates = 100
+    triplet_partner_k = None
     
     i = 3
     while i < len(sys.argv):
@@ -329,6 +611,9 @@ def main():
         elif sys.argv[i] == '--max-gap-percent':
             max_gap_pct = float(sys.argv[i+1])
             i += 2
+        elif sys.argv[i] == '--min-entropy':
+            min_entropy = float(sys.argv[i+1])
+            i += 2
         elif sys.argv[i] == '--top-pairs':
             top_n = int(sys.argv[i+1])
             i += 2
@@ -341,6 +626,9 @@ def main():
         elif sys.argv[i] == '--triplet-candidates':
             triplet_candidates = int(sys.argv[i+1])
             i += 2
+        elif sys.argv[i] == '--triplet-partner-k':
+            triplet_partner_k = int(sys.argv[i+1])
+            i += 2
         else:
             i += 1
     
@@ -369,7 +657,13 @@ def main():
     filtered_array, filtered_positions, filtered_labels = filter_by_gaps(
         alignment_array, aln_positions, aln_to_label, max_gap_pct
     )
-    
+
+    # Invariant columns carry no covariation signal; drop them before
+    # any pairwise work
+    filtered_array, filtered_positions = filter_invariant_columns(
+        filtered_array, filtered_positions, min_entropy
+    )
+
     # Compute covariance
     cov_df = compute_covariance_matrix(filtered_array, filtered_positions, filtered_labels)
     
@@ -382,9 +676,18 @@ def main():
     stats_file = os.path.join(output_dir, "summary_statistics.txt")
     save_summary_stats(cov_df, stats_file)
     
-    # Heatmap
+    # Heatmap; above ~200 positions the figure path lays out O(L^2)
+    # artists in Agg, so write the raw pixel map directly instead
     heatmap_file = os.path.join(output_dir, "covariance_heatmap.png")
-    plot_heatmap(cov_df, heatmap_file)
+    if len(cov_df) > 200:
+        values = cov_df.values
+        vmax = float(np.abs(values).max())
+        if vmax == 0.0:
+            vmax = 1.0
+        plt.imsave(heatmap_file, values, cmap='RdBu_r', vmin=-vmax, vmax=vmax)
+        print(f"  Saved heatmap ({len(cov_df)} positions, pixel map): {heatmap_file}")
+    else:
+        plot_heatmap(cov_df, heatmap_file)
     
     # Top pairs
     print("\nIdentifying top covarying pairs...")
@@ -404,7 +707,8 @@ def main():
                                      list(range(len(filtered_positions))),
                                      filtered_labels,
                                      top_n=20,
-                                     max_candidates=triplet_candidates)
+                                     max_candidates=triplet_candidates,
+                                     partner_k=triplet_partner_k)
         
         if triplets:
             triplet_file = os.path.join(output_dir, "covarying_triplets.txt")
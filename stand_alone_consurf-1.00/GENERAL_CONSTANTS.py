@@ -1,44 +1,93 @@
 
 
+from types import MappingProxyType
 
+# Configuration grouped into two frozen mappings: external tool and
+# database locations (PATHS) and numeric tuning values (PARAMS).
+# Freezing them documents what is configuration vs constant, and hot
+# loops elsewhere can bind the mapping once locally instead of doing a
+# module attribute traversal per access.
 
+PATHS = MappingProxyType({
+    "clustalw": "/opt/homebrew/bin/clustalw",
+    "clustalw_2_0_10": "/opt/homebrew/bin/clustalw",
+    "mafft_linsi_guidance": "/opt/anaconda3/envs/python3.10bio/bin/mafft",
+    "prank": "/opt/homebrew/bin/prank",
+    "muscle": "/opt/homebrew/bin/muscle",
 
-CLUSTALW = "/opt/homebrew/bin/clustalw"
-CLUSTALW_2_0_10 = "/opt/homebrew/bin/clustalw"
-MAFFT_LINSI_GUIDANCE = "/opt/anaconda3/envs/python3.10bio/bin/mafft"
-PRANK = "/opt/homebrew/bin/prank"  
-MUSCLE = "/opt/homebrew/bin/muscle"
+    "rate4site": "/Users/constanrine5d/programs/ConSurf/bin/rate4site",
+    "rate4site_ml": "/Users/constanrine5d/programs/ConSurf/bin/rate4site",
+    "rate4site_slow": "/Users/constanrine5d/programs/ConSurf/bin/rate4site_doublerep",
 
-RATE4SITE  =  "/Users/constanrine5d/programs/ConSurf/bin/rate4site"
-RATE4SITE_ML = "/Users/constanrine5d/programs/ConSurf/bin/rate4site"
-RATE4SITE_SLOW = "/Users/constanrine5d/programs/ConSurf/bin/rate4site_doublerep"
+    "blastall": "/opt/homebrew/bin/blastall",
+    "blastpgp": "/opt/homebrew/bin/psiblast",
+    "cs_blast": "/opt/homebrew/bin/csblast",
+    "cs_blast_data": "/opt/homebrew/share/csblast/data",
+    "blast_path": "/opt/homebrew/bin",
+    "nr_nuc_db_fasta": "/Volumes/const_2tb/consurf_databases/nt.fa",
+    "nr_nuc_db": "/Volumes/const_2tb/consurf_databases/nt",
 
-BLASTALL = "/opt/homebrew/bin/blastall"
-BLASTPGP = "/opt/homebrew/bin/psiblast"
-CS_BLAST = "/opt/homebrew/bin/csblast"
-CS_BLAST_DATA = "/opt/homebrew/share/csblast/data"
-BLAST_PATH = "/opt/homebrew/bin"
-NR_NUC_DB_FASTA = "/Volumes/const_2tb/consurf_databases/nt.fa"
-NR_NUC_DB = "/Volumes/const_2tb/consurf_databases/nt"
+    "swissprot_db": "/Volumes/const_2tb/consurf_databases/uniprot_sprot.fasta",
+    "uniprot_db": "/Volumes/const_2tb/consurf_databases/uniprot_trembl.fasta",
+    "uniref90_db": "/Volumes/const_2tb/consurf_databases/uniprot_trembl.fasta",  # Default database: UniProt TrEMBL
+    "clean_uniprot_db": "/Volumes/const_2tb/consurf_databases/clean_uniprot.fasta",
+    "nr_prot_db": "/Volumes/const_2tb/consurf_databases/nr.fasta",
 
-BLAST_MAX_HOMOLOGUES_TO_DISPLAY = 500
-FRAGMENT_OVERLAP = 0.10
-FRAGMENT_MINIMUM_LENGTH = 0.60
-MINIMUM_FRAGMENTS_FOR_MSA = 5
-LOW_NUM_FRAGMENTS_FOR_MSA = 10
-MAXIMUM_MODIFIED_PERCENT = 0.15
+    "uniref90_db_fasta": "/Volumes/const_2tb/consurf_databases/uniprot_trembl.fasta",
+    "swissprot_db_fasta": "/Volumes/const_2tb/consurf_databases/uniprot_sprot.fasta",
+    "clean_uniprot_db_fasta": "/Volumes/const_2tb/consurf_databases/clean_uniprot.fasta",
+    "nr_prot_db_fasta": "/Volumes/const_2tb/consurf_databases/nr.fa",
+    "uniprot_db_fasta": "/Volumes/const_2tb/consurf_databases/uniprot_trembl.fasta",
 
-SWISSPROT_DB = "/Volumes/const_2tb/consurf_databases/uniprot_sprot.fasta"
-UNIPROT_DB = "/Volumes/const_2tb/consurf_databases/uniprot_trembl.fasta"
-UNIREF90_DB = "/Volumes/const_2tb/consurf_databases/uniprot_trembl.fasta"  # Default database: UniProt TrEMBL
-CLEAN_UNIPROT_DB = "/Volumes/const_2tb/consurf_databases/clean_uniprot.fasta"
-NR_PROT_DB = "/Volumes/const_2tb/consurf_databases/nr.fasta"
+    "cd_hit_dir": "/opt/anaconda3/envs/python3.10bio/bin/",
+})
 
-UNIREF90_DB_FASTA = "/Volumes/const_2tb/consurf_databases/uniprot_trembl.fasta"
-SWISSPROT_DB_FASTA = "/Volumes/const_2tb/consurf_databases/uniprot_sprot.fasta"
-CLEAN_UNIPROT_DB_FASTA = "/Volumes/const_2tb/consurf_databases/clean_uniprot.fasta"
-NR_PROT_DB_FASTA = "/Volumes/const_2tb/consurf_databases/nr.fa"
-UNIPROT_DB_FASTA = "/Volumes/const_2tb/consurf_databases/uniprot_trembl.fasta"
+PARAMS = MappingProxyType({
+    "blast_max_homologues_to_display": 500,
+    "fragment_overlap": 0.10,
+    "fragment_minimum_length": 0.60,
+    "minimum_fragments_for_msa": 5,
+    "low_num_fragments_for_msa": 10,
+    "maximum_modified_percent": 0.15,
+})
 
-CD_HIT_DIR = "/opt/anaconda3/envs/python3.10bio/bin/"
+# Backward-compatible module-level names; existing callers keep using
+# GENERAL_CONSTANTS.<NAME>
+CLUSTALW = PATHS["clustalw"]
+CLUSTALW_2_0_10 = PATHS["clustalw_2_0_10"]
+MAFFT_LINSI_GUIDANCE = PATHS["mafft_linsi_guidance"]
+PRANK = PATHS["prank"]
+MUSCLE = PATHS["muscle"]
 
+RATE4SITE = PATHS["rate4site"]
+RATE4SITE_ML = PATHS["rate4site_ml"]
+RATE4SITE_SLOW = PATHS["rate4site_slow"]
+
+BLASTALL = PATHS["blastall"]
+BLASTPGP = PATHS["blastpgp"]
+CS_BLAST = PATHS["cs_blast"]
+CS_BLAST_DATA = PATHS["cs_blast_data"]
+BLAST_PATH = PATHS["blast_path"]
+NR_NUC_DB_FASTA = PATHS["nr_nuc_db_fasta"]
+NR_NUC_DB = PATHS["nr_nuc_db"]
+
+BLAST_MAX_HOMOLOGUES_TO_DISPLAY = PARAMS["blast_max_homologues_to_display"]
+FRAGMENT_OVERLAP = PARAMS["fragment_overlap"]
+FRAGMENT_MINIMUM_LENGTH = PARAMS["fragment_minimum_length"]
+MINIMUM_FRAGMENTS_FOR_MSA = PARAMS["minimum_fragments_for_msa"]
+LOW_NUM_FRAGMENTS_FOR_MSA = PARAMS["low_num_fragments_for_msa"]
+MAXIMUM_MODIFIED_PERCENT = PARAMS["maximum_modified_percent"]
+
+SWISSPROT_DB = PATHS["swissprot_db"]
+UNIPROT_DB = PATHS["uniprot_db"]
+UNIREF90_DB = PATHS["uniref90_db"]
+CLEAN_UNIPROT_DB = PATHS["clean_uniprot_db"]
+NR_PROT_DB = PATHS["nr_prot_db"]
+
+UNIREF90_DB_FASTA = PATHS["uniref90_db_fasta"]
+SWISSPROT_DB_FASTA = PATHS["swissprot_db_fasta"]
+CLEAN_UNIPROT_DB_FASTA = PATHS["clean_uniprot_db_fasta"]
+NR_PROT_DB_FASTA = PATHS["nr_prot_db_fasta"]
+UNIPROT_DB_FASTA = PATHS["uniprot_db_fasta"]
+
+CD_HIT_DIR = PATHS["cd_hit_dir"]